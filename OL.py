@@ -1,48 +1,80 @@
 # -*- coding: utf-8 -*-
 
 
-import copy
-import itertools
 import time
+import functools
 
 import tools
 
+# given an order over elements of a population pop (list of singletons)
+# returns the bit (see tools.get_bits) of each element of pop, from best to worst
+def get_ranked_bits(order, pop) :
+	bits = tools.get_bits(pop)
+	return [bits[x[0]] for x in order]
+
+
+# given an order over elements of a population pop (list of singletons)
+# returns for each bitmask of the powerset of pop (list indexed by bitmask) the positions in order of the elements of the coalition it encodes, from best to worst (tuple)
+def get_signatures(order, pop) :
+	bits = get_ranked_bits(order, pop)
+	sigs = [()]*(1 << len(pop))
+	# coalitions of the elements ranked after position i, extended with the element at position i
+	built = [0]
+	for i in range(len(bits)-1, -1, -1) :
+		for k in range(len(built)) :
+			m = built[k]
+			sigs[m | bits[i]] = (i,)+sigs[m]
+			built.append(m | bits[i])
+	return sigs
+
+
+# given an order over elements of a population pop (list of singletons)
+# returns for each bitmask of the powerset of pop (list indexed by bitmask) the bitmask of the positions in order of the elements of the coalition it encodes (bit i set if the element at position i is in it)
+def get_rank_masks(order, pop) :
+	bits = get_ranked_bits(order, pop)
+	rank = {bits[i]: 1 << i for i in range(len(bits))}
+	res = [0]*(1 << len(pop))
+	for m in range(1, len(res)) :
+		low = m & -m
+		res[m] = res[m ^ low] | rank[low]
+	return res
+
+
+# given an order over elements of a population pop (list of singletons)
+# returns a function associating to a bitmask the positions in order of the elements of the coalition it encodes
+def get_positions(order, pop) :
+	pos = [order.index((x,)) for x in pop]
+	return lambda m : [pos[i] for i in range(len(pos)) if m >> i & 1]
+
+
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using minmax
 def minmax(order, pop) :
-	res = []
-	to_extend = tools.generate_powerset(pop, 1)
-	for i in range(len(order)-1,0,-1) :
-		tmp = []
-		worst = [C for C in to_extend if order[i][0] in C]
-		to_extend = [C for C in to_extend if C not in worst]
-		k= 0
-		while k in range(i) and worst :
-			best = [C for C in worst if order[k][0] in C]
-			tmp.append(copy.deepcopy(best))
-			worst = [C for C in worst if C not in best]
-			k += 1
-		res = tmp + [[order[i]]] + res
-	return [[order[0]]] + res
+	n = len(pop)
+	ranks = get_rank_masks(order, pop)
+	# coalitions are ordered by their worst element, then by their best one: one equivalence class for each pair of positions b <= w
+	res = [[] for i in range(n*(n+1)//2)]
+	for C in tools.generate_powerset_masks(n, 1) :
+		r = ranks[C]
+		w = r.bit_length()-1
+		b = (r & -r).bit_length()-1
+		res[w*(w+1)//2+b].append(C)
+	return tools.from_masks(res, pop)
 
 
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using maxmin
 def maxmin(order, pop) :
-	res = []
-	to_extend = tools.generate_powerset(pop, 1)
-	for i in range(len(order)) :
-		tmp = []
-		best = [C for C in to_extend if order[i][0] in C]
-		to_extend = [C for C in to_extend if C not in best]
-		k=len(order)-1
-		while k > i and best :
-			worst = [C for C in best if order[k][0] in C]
-			tmp.insert(0,copy.deepcopy(worst))
-			best = [C for C in best if C not in worst]
-			k -= 1
-		res = res + [[order[i]]] + tmp
-	return res
+	n = len(pop)
+	ranks = get_rank_masks(order, pop)
+	# coalitions are ordered by their best element, then by their worst one: one equivalence class for each pair of positions b <= w
+	res = [[] for i in range(n*(n+1)//2)]
+	for C in tools.generate_powerset_masks(n, 1) :
+		r = ranks[C]
+		w = r.bit_length()-1
+		b = (r & -r).bit_length()-1
+		res[b*n-b*(b-1)//2+w-b].append(C)
+	return tools.from_masks(res, pop)
 
 
 # given two vectors of different sizes s and s+1, each describing a coalition (A or B) by the position of its elements in the ranking (ordered from either worst to best [leximin] or best to worst [leximax])
@@ -64,174 +96,102 @@ def diff_size_comp(v_A,v_B) :
 	return -1
 
 
+# given a comparison comp of two vectors describing coalitions (returning 1 if A > B, 0 if B > A or -1 otherwise) and the vector of each coalition
+# returns the key sorting coalitions from best to worst according to comp
+def get_sort_key(comp, vecs) :
+	return functools.cmp_to_key(lambda A, B : [0, 1, -1][comp(vecs[A], vecs[B])+1])
+
+
+# given two vectors describing coalitions A and B by the position of their elements in the ranking, from worst to best
+# returns 1 if A > B, 0 if B > A according to leximin, with the Gärdenfors principle (-1 if A = B)
+def leximin_comp(v_A, v_B) :
+	if v_A == v_B :
+		return -1
+	# by definition of leximin, the emptyset is the worst possible set
+	if len(v_A) == 0 or len(v_B) == 0 :
+		return int(len(v_B) == 0)
+	# if one is the superset of the other with only one more element
+	if abs(len(v_A)-len(v_B))== 1 and (len([x for x in v_A if x not in v_B])==1 or len([x for x in v_B if x not in v_A])==1):
+		r = diff_size_comp(v_A,v_B)
+		if r != -1 :
+			return r
+	# lexicographical comparison of v_A and v_B
+	return tools.lex_comp_min(v_A,v_B)
+
+
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using leximin
+# reference implementation comparing coalitions pairwise (see leximin2)
 def leximin(order, pop) :
-	res = []
-	to_extend = tools.generate_powerset(pop,0)
-	for i in range(len(to_extend)) :
-		v_A = [order.index((x,)) for x in to_extend[i]]
-		v_A.sort(reverse=True)
-		for j in range(i+1,len(to_extend)) :
-			v_B = [order.index((x,)) for x in to_extend[j]]
-			v_B.sort(reverse=True)
-			# by definition of leximin, the emptyset is the worst possible set
-			if len(v_A) == 0 :
-				res += [[to_extend[j],to_extend[i]]]
-				continue
-			# if one is the superset of the other with only one more element
-			if abs(len(v_A)-len(v_B))== 1 and (len([x for x in v_A if x not in v_B])==1 or len([x for x in v_B if x not in v_A])==1):
-				r = diff_size_comp(v_A,v_B)
-				# if A > B
-				if r == 1 :
-					res += [[to_extend[i],to_extend[j]]]
-					continue
-				# if B > A
-				elif r == 0 :
-					res += [[to_extend[j],to_extend[i]]]
-					continue
-			# lexicographical comparison of v_A and v_B
-			rel = tools.lex_comp_min(v_A,v_B)
-			# if A > B
-			if rel == 1 :
-				res += [[to_extend[i],to_extend[j]]]
-			# if B > A
-			elif rel == 0 :
-				res += [[to_extend[j],to_extend[i]]]
-			# we do not deal with equivalences, as only identical coalitions are equivalent
-	res = tools.join_prefs_coal(res, to_extend)
-	return res
-
-
-# given a list of coalitions (tuples) and the order over individuals
-# returns preferences over the given coalitions using recursion
-def join_min(coals, order) : 
-	if not coals :
-		return coals
-	v_A = [order.index((x,)) for x in coals[0]]
-	v_A.sort(reverse=True)
-	better = []
-	worse = []
-	for i in range(1, len(coals)) :
-		v_B = [order.index((x,)) for x in coals[i]]
-		v_B.sort(reverse=True)
-		# by definition of leximin, the emptyset is the worst possible set
-		if len(v_B) == 0 :
-			worse.append(coals[i])
-			continue
-		# lexicographical comparison of v_A and v_B
-		rel = tools.lex_comp_min(v_A,v_B)
-		# if A > B
-		if rel == 1 :
-			worse.append(coals[i])
-		# if B > A
-		elif rel == 0 :
-			better.append(coals[i])
-		# we do not deal with equivalences, as only identical coalitions are equivalent
-	return join_min(better, order)+[[coals[0]]]+join_min(worse, order)
+	positions = get_positions(order, pop)
+	to_extend = tools.generate_powerset_masks(len(pop),0)
+	vecs = {C: sorted(positions(C), reverse=True) for C in to_extend}
+	# we do not deal with equivalences, as only identical coalitions are equivalent: comparisons give a total order, obtained by sorting
+	return tools.from_masks([[C] for C in sorted(to_extend, key=get_sort_key(leximin_comp, vecs))], pop)
 
 
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using leximin
 def leximin2(order, pop) :
-	to_extend = tools.generate_powerset(pop,0)
-	to_extend = to_extend[::-1]
-	return join_min(to_extend, order)
+	sigs = get_signatures(order, pop)
+	n = len(pop)
+	return tools.from_masks([[m] for m in sorted(range(1 << n), key=lambda m : sigs[m][::-1]+(n,))], pop)
+
+
+# given two vectors describing coalitions A and B by the position of their elements in the ranking, from best to worst
+# returns 1 if A > B, 0 if B > A according to leximax, with the Gärdenfors principle (-1 if A = B)
+def leximax_comp(v_A, v_B) :
+	if v_A == v_B :
+		return -1
+	# by definition of leximax, the emptyset is the best possible set
+	if len(v_A) == 0 or len(v_B) == 0 :
+		return int(len(v_A) == 0)
+	# if one is the superset of the other with only one more element
+	if abs(len(v_A)-len(v_B))== 1 and (len([x for x in v_A if x not in v_B])==1 or len([x for x in v_B if x not in v_A])==1):
+		r = diff_size_comp(v_A,v_B)
+		if r != -1 :
+			return r
+	# lexicographical comparison of v_A and v_B
+	return tools.lex_comp_max(v_A,v_B)
 
 
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using leximax (aka anti-lexcel?)
+# reference implementation comparing coalitions pairwise (see leximax2)
 def leximax(order, pop) :
-	res = []
-	to_extend = tools.generate_powerset(pop,0)
-	for i in range(len(to_extend)) :
-		v_A = [order.index((x,)) for x in to_extend[i]]
-		v_A.sort()
-		for j in range(i+1,len(to_extend)) :
-			v_B = [order.index((x,)) for x in to_extend[j]]
-			v_B.sort()
-			# by definition of leximax, the emptyset is the best possible set
-			if len(v_A) == 0 :
-				res += [[to_extend[i],to_extend[j]]]
-				continue
-			# if one is the superset of the other with only one more element
-			if abs(len(v_A)-len(v_B))== 1 and (len([x for x in v_A if x not in v_B])==1 or len([x for x in v_B if x not in v_A])==1):
-				r = diff_size_comp(v_A,v_B)
-				# if A > B
-				if r == 1 :
-					res += [[to_extend[i],to_extend[j]]]
-					continue
-				# if B > A
-				elif r == 0 :
-					res += [[to_extend[j],to_extend[i]]]
-					continue
-			# lexicographical comparison of v_A and v_B
-			rel = tools.lex_comp_max(v_A,v_B)
-			# if A > B
-			if rel == 1 :
-				res += [[to_extend[i],to_extend[j]]]
-			# if B > A
-			elif rel == 0 :
-				res += [[to_extend[j],to_extend[i]]]
-	res = tools.join_prefs_coal(res, to_extend)
-	return res
-
-
-# given a list of coalitions (tuples) and the order over individuals
-# returns preferences over the given coalitions using recursion
-def join_max(coals, order) : 
-	if not coals :
-		return coals
-	v_A = [order.index((x,)) for x in coals[0]]
-	v_A.sort()
-	better = []
-	worse = []
-	for i in range(1, len(coals)) :
-		v_B = [order.index((x,)) for x in coals[i]]
-		v_B.sort()
-		# by definition of leximax, the emptyset is the best possible set
-		if len(v_B) == 0 :
-			better.append(coals[i])
-			continue
-		# lexicographical comparison of v_A and v_B
-		rel = tools.lex_comp_max(v_A,v_B)
-		# if A > B
-		if rel == 1 :
-			worse.append(coals[i])
-		# if B > A
-		elif rel == 0 :
-			better.append(coals[i])
-		# we do not deal with equivalences, as only identical coalitions are equivalent
-	return join_max(better, order)+[[coals[0]]]+join_max(worse, order)
+	positions = get_positions(order, pop)
+	to_extend = tools.generate_powerset_masks(len(pop),0)
+	vecs = {C: sorted(positions(C)) for C in to_extend}
+	return tools.from_masks([[C] for C in sorted(to_extend, key=get_sort_key(leximax_comp, vecs))], pop)
 
 
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using leximax
 def leximax2(order, pop) :
-	to_extend = tools.generate_powerset(pop,0)
-	to_extend = to_extend[::-1]
-	return join_max(to_extend, order)
+	sigs = get_signatures(order, pop)
+	return tools.from_masks([[m] for m in sorted(range(1 << len(pop)), key=lambda m : sigs[m])], pop)
 
 
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using indirect-utility ranking
 def indirect_utility(order, pop) :
-	res = []
-	to_extend = tools.generate_powerset(pop,1)
-	for i in range(len(order)) :
-		best = [C for C in to_extend if order[i][0] in C]
-		to_extend = [C for C in to_extend if C not in best]
-		res.append(best)
-	return res
+	ranks = get_rank_masks(order, pop)
+	# coalitions are ordered by their best element
+	res = [[] for x in order]
+	for C in tools.generate_powerset_masks(len(pop),1) :
+		r = ranks[C]
+		res[(r & -r).bit_length()-1].append(C)
+	return tools.from_masks(res, pop)
 
 
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using cardinality-based ordering
 def cardinality(order, pop) :
 	res = []
-	for i in range(len(pop)+1, 0, -1) :
-		res.append(list(itertools.combinations([i+1 for i in range(N)],i)))
-	return res
+	to_extend = tools.generate_powerset_masks(len(pop),1)
+	for i in range(len(pop), 0, -1) :
+		res.append([C for C in to_extend if tools.mask_size(C) == i])
+	return tools.from_masks(res, pop)
 
 
 # given an order over elements of a population pop
@@ -252,32 +212,31 @@ def indirect_u_card(order, pop) :
 # given an order over elements of a population pop
 # returns the order over the powerset of pop using cardinality and indirect utility as a tie-breaker
 def card_ind_u(order, pop) :
-	res = cardinality(order, pop)
+	bits = get_ranked_bits(order, pop)
+	to_extend = tools.generate_powerset_masks(len(pop),1)
 	res2 = []
-	for eq in res :
-		tmp = [el for el in eq]
+	for j in range(len(pop), 0, -1) :
+		tmp = [C for C in to_extend if tools.mask_size(C) == j]
 		new = []
 		for i in range(len(order)) :
-			best = [C for C in tmp if order[i][0] in C]
-			tmp = [C for C in tmp if C not in best]
+			best = [C for C in tmp if C & bits[i]]
+			tmp = [C for C in tmp if not C & bits[i]]
 			new.append(best)
 		res2 += new
-	return res2
+	return tools.from_masks(res2, pop)
 
 
 
 # given an order over elements of a population pop
 # computes ranking over the powerset of pop using borda score of its components
 def borda_like(order, pop) :
-	to_extend = tools.generate_powerset(pop,0)
-	score = [0 for _ in to_extend]
-	for i in range(len(to_extend)) :
-		for el in to_extend[i] :
-			score[i] += len(order)-order.index((el,))
-	res = []
-	while to_extend :
-		tmp = [x for x in to_extend if score[to_extend.index(x)]==max(score)]
-		res.append(tmp)
-		to_extend=[x for x in to_extend if x not in tmp]
-		score = [s for s in score if s != max(score)]
-	return res
\ No newline at end of file
+	bits = get_ranked_bits(order, pop)
+	# score of each element: len(order) for the best one, down to 1 for the worst one
+	points = {bits[i]: len(order)-i for i in range(len(bits))}
+	# score of each bitmask, from that of the coalition without its lowest bit
+	score = [0]*(1 << len(pop))
+	for m in range(1, len(score)) :
+		low = m & -m
+		score[m] = score[m ^ low]+points[low]
+	to_extend = tools.generate_powerset_masks(len(pop),0)
+	return tools.from_masks(tools.group_by_score(to_extend, [score[C] for C in to_extend]), pop)
\ No newline at end of file
@@ -1,67 +1,175 @@
 # -*- coding: utf-8 -*-
 
+import numpy as np
+
 import tools
 
 # given an order (list of equivalence classes) of prefs over coalitions and a population N (list of individuals)
 # returns the lexcel ranking over individuals
 def lexcel(prefs, N) :
+	prefs = tools.to_preorder(prefs)
+	rank = prefs.rank_array(N)
+	# occurrence vectors: occ[i, cpt] is the number of coalitions of prefs[cpt] containing N[i]
+	S = np.arange(2**len(N))
+	member = ((S[None,:] >> np.arange(len(N))[:,None]) & 1).astype(bool) & (rank >= 0)
+	flat = (np.nonzero(member)[0]*len(prefs)) + rank[np.nonzero(member)[1]]
+	occ = np.bincount(flat, minlength=len(N)*len(prefs)).reshape(len(N), len(prefs))
+	return lexcel_walk(occ, N, [i for i in range(len(N))])
+
+
+# given the occurrence vectors occ of the individuals of N (see lexcel) and the indices P in N of a subpopulation
+# returns the lexcel ranking over P
+# individuals left after a tie keep being compared from the next equivalence class on, as always done by lexcel
+def lexcel_walk(occ, N, P) :
 	res = []
-	cur = [i for i in N]
+	cur = P
 	cpt = 0
-	seen = []
-
-	while cpt in range(len(prefs)) and len(res) != len(N) :
-		score = [0 for _ in cur]
-		for c in prefs[cpt] :
-			for el in c :
-				if el in cur :
-					score[cur.index(el)] += 1
-		cur = [el for el in cur if score[cur.index(el)]==max(score)]
-		if len(cur) == 1 :
-			res.append(cur)
-			seen += cur
-		elif len(cur) < len(N) :
-			tmp = lexcel(prefs,cur)
-			res += tmp
-			seen += [i for i in cur]
-			cpt += 1
+	while cpt < occ.shape[1] and len(res) != len(P) and cur :
+		if len(cur) == len(P) :
+			# skip the equivalence classes in which all of P appear the same number of times
+			diff = np.nonzero((occ[cur, cpt:] != occ[cur[0], cpt:]).any(axis=0))[0]
+			if len(diff) == 0 :
+				break
+			cpt += int(diff[0])
+		score = occ[cur, cpt].tolist()
+		top = max(score)
+		best = [cur[i] for i in range(len(cur)) if score[i] == top]
+		if len(best) == 1 :
+			res.append([N[best[0]]])
 		else :
+			res += lexcel_walk(occ, N, best)
 			cpt += 1
-		cur = [i for i in N if i not in seen]
+		cur = [i for i in cur if i not in best]
 
 	if cur :
-		res.append(cur)
+		res.append([N[i] for i in cur])
 	return res
 
 
+# given the rank array (2^n) of a complete partial preorder over the coalitions of N, the step at which each coalition arrives and the number of steps (see CP_tallies_nested)
+# returns the lexcel ranking over the coalitions arrived up to each step (one ranking per step)
+# occurrence vectors are accumulated along the steps, the equivalence classes of the partial preorder at a step being those in which a coalition arrived
+def lexcel_nested(rank, steps, nb_steps, N) :
+	n = len(N)
+	nb_cl = int(rank.max())+1
+	S = np.arange(2**n)
+	member = ((S[None,:] >> np.arange(n)[:,None]) & 1).astype(bool) & (rank >= 0)
+	i, m = np.nonzero(member)
+	occ = np.bincount((steps[m]*n+i)*nb_cl+rank[m], minlength=(nb_steps+1)*n*nb_cl).reshape(nb_steps+1, n, nb_cl)
+	occ = np.cumsum(occ, axis=0)
+	# first step at which a coalition of each equivalence class arrives
+	first = np.full(nb_cl, nb_steps)
+	np.minimum.at(first, rank[rank >= 0], steps[rank >= 0])
+	return [lexcel_walk(occ[g][:, first <= g], N, [i for i in range(n)]) for g in range(nb_steps)]
+
+
+# given a rank array (see tools.Preorder.rank_array, possibly stacked along leading axes) over the coalitions of a population of size n
+# returns the array wins such that wins[..., i, j] is the number of coalitions S containing neither i nor j for which S+i > S+j
+def CP_tallies(rank, n) :
+	S = np.arange(2**n)
+	bits = 1 << np.arange(n)
+	# free[i, S] if S does not contain i
+	free = (S[None,:] & bits[:,None]) == 0
+	# with_i[..., i, S] is the rank of S+i
+	with_i = rank[..., S[None,:] | bits[:,None]]
+	present = with_i >= 0
+	wins = np.zeros(rank.shape[:-1]+(n,n), dtype=np.int64)
+	for i in range(n) :
+		valid = free[i] & free & present[..., i:i+1, :] & present
+		wins[..., i, :] = (valid & (with_i[..., i:i+1, :] < with_i)).sum(axis=-1)
+	return wins
+
+
+# given a rank array (see tools.Preorder.rank_array, possibly stacked along leading axes) over the coalitions of a population of size n
+# returns the arrays pro and neg such that pro[..., i] (resp. neg[..., i]) is the number of coalitions S without i for which S+i is considered better (resp. worse) than S
+def banzhaf_counts(rank, n) :
+	S = np.arange(2**n)
+	bits = 1 << np.arange(n)
+	free = (S[None,:] & bits[:,None]) == 0
+	with_i = rank[..., S[None,:] | bits[:,None]]
+	without = rank[..., None, :]
+	# same outcomes as tools.is_before(S+i, S, prefs): a missing S+i counts against i
+	pro = free & (with_i >= 0) & ((without < 0) | (with_i < without))
+	neg = free & ((with_i < 0) | ((without >= 0) & (with_i > without)))
+	return pro.sum(axis=-1), neg.sum(axis=-1)
+
+
+# the following functions evaluate nested partial preorders: coalitions arrive one after the other, and the partial preorder at a given step is made of the coalitions arrived up to it
+# given rank arrays (trials x 2^n, see tools.Preorder.rank_array) of the complete partial preorders, the step at which each coalition arrives (steps, trials x 2^n, nb_steps if never) and the number of steps
+# returns the arrays wins such that wins[t, g] are the tallies of CP_tallies over the coalitions of trial t arrived up to step g
+# a pair S+i, S+j is counted from the step at which the last of them arrives, the tallies being accumulated along the steps
+def CP_tallies_nested(rank, steps, nb_steps, n) :
+	nb_t = rank.shape[0]
+	S = np.arange(2**n)
+	bits = 1 << np.arange(n)
+	free = (S[None,:] & bits[:,None]) == 0
+	with_i = rank[:, S[None,:] | bits[:,None]]
+	step_i = steps[:, S[None,:] | bits[:,None]]
+	# index of (trial, step, j) in the flattened tallies, coalitions that never arrive going to step nb_steps, dropped
+	base = (np.arange(nb_t)[:,None,None]*(nb_steps+1))*n+np.arange(n)[None,:,None]
+	wins = np.zeros((nb_t, nb_steps+1, n, n), dtype=np.int64)
+	for i in range(n) :
+		valid = free[i] & free & (with_i[:, i:i+1, :] >= 0) & (with_i[:, i:i+1, :] < with_i)
+		flat = base+np.maximum(step_i[:, i:i+1, :], step_i)*n
+		wins[:, :, i, :] = np.bincount(flat[valid], minlength=nb_t*(nb_steps+1)*n).reshape(nb_t, nb_steps+1, n)
+	return np.cumsum(wins, axis=1)[:, :nb_steps]
+
+
+# given rank arrays (trials x 2^n) of the complete partial preorders, the step at which each coalition arrives and the number of steps (see CP_tallies_nested)
+# returns the arrays pro and neg such that pro[t, g] and neg[t, g] are the counts of banzhaf_counts over the coalitions of trial t arrived up to step g
+# S+i counts for i from its arrival on, until S arrives if S is not worse; it counts against i until it arrives, then from the arrival of both if S is better
+def banzhaf_counts_nested(rank, steps, nb_steps, n) :
+	nb_t = rank.shape[0]
+	S = np.arange(2**n)
+	bits = 1 << np.arange(n)
+	free = (S[None,:] & bits[:,None]) == 0
+	with_i = rank[:, S[None,:] | bits[:,None]]
+	without = rank[:, None, :]
+	step_i = steps[:, S[None,:] | bits[:,None]]
+	both = np.maximum(step_i, steps[:, None, :])
+	base = (np.arange(nb_t)[:,None,None]*(nb_steps+1))*n+np.arange(n)[None,:,None]
+	size = nb_t*(nb_steps+1)*n
+	# arrivals of S+i, arrivals of both S and S+i with S at least as good, and with S better
+	arrived = np.bincount((base+step_i*n)[free & (with_i >= 0)], minlength=size)
+	not_worse = np.bincount((base+both*n)[free & (without >= 0) & (with_i >= without)], minlength=size)
+	better = np.bincount((base+both*n)[free & (without >= 0) & (with_i > without)], minlength=size)
+	arrived, not_worse, better = [np.cumsum(x.reshape(nb_t, nb_steps+1, n), axis=1)[:, :nb_steps] for x in [arrived, not_worse, better]]
+	return arrived-not_worse, 2**(n-1)-arrived+better
+
+
+# given an order (list of equivalence classes) prefs over coalitions and a population N (list of individuals)
+# returns the dominance matrix of CP-majority: bool array W such that W[i, j] if N[i] is preferred or equivalent to N[j] (i != j)
+# CAREFUL: CP-majority leads to cycles
+def CP_matrix(prefs, N) :
+	return CP_matrices(tools.to_preorder(prefs).rank_array(N), len(N))
+
+
+# given a rank array (see tools.Preorder.rank_array, possibly stacked along leading axes) over the coalitions of a population of size n
+# returns the dominance matrices of CP-majority (see CP_matrix)
+def CP_matrices(rank, n) :
+	return CP_dominance(CP_tallies(rank, n))
+
+
+# given tallies wins (..., n, n, see CP_tallies)
+# returns the dominance matrices of CP-majority they lead to (see CP_matrix)
+def CP_dominance(wins) :
+	n = wins.shape[-1]
+	W = wins >= np.swapaxes(wins, -1, -2)
+	W[..., np.arange(n), np.arange(n)] = False
+	return W
+
+
 # given an order (list of equivalence classes) prefs over coalitions and a population N (list of individuals)
 # returns a list of pairwise preferences over individuals obtained using CP-majority
 # CAREFUL: CP-majority leads to cycles
 def CPmaj(prefs, N) :
+	W = CP_matrix(prefs, N).tolist()
 	res = []
 	for i in range(len(N)) :
 		for j in range(i+1, len(N)) :
-			# retrieve coalitions containing neither N[i] nor N[j]
-			t = tools.generate_powerset([e for e in N if e!=N[i] and e!=N[j]],0)
-			pro_i = 0
-			pro_j = 0
-			for c in t :
-				c1 = list(c) + [N[i]]
-				c1.sort()
-				c1 = tuple(c1)
-				c2 = list(c) + [N[j]]
-				c2.sort()
-				c2 = tuple(c2)
-				if not tools.is_present(c1,prefs) or not tools.is_present(c2,prefs) :
-					continue
-				before = tools.is_before(c1, c2,prefs) 
-				if before == True :
-					pro_i += 1
-				elif before != -1 :
-					pro_j += 1
-			if pro_i >= pro_j :
+			if W[i][j] :
 				res.append([N[i],N[j]])
-			if pro_j >= pro_i :
+			if W[j][i] :
 				res.append([N[j],N[i]])
 	return res
 
@@ -69,26 +177,5 @@ def CPmaj(prefs, N) :
 # given an order (list of equivalence classes) prefs over coalitions and a population N (list of individuals)
 # returns ranking over individuals using ordinal Banzhaf
 def ordinal_banzhaf(prefs, N) :
-	res = []
-	score = [0 for _ in N]
-	for el in N :
-		t = tools.generate_powerset([e for e in N if e!=el],0)
-		pro_el = 0
-		neg_el = 0
-		for c in t :
-			c2 = list(c)+[el]
-			c2.sort()
-			c2 = tuple(c2)
-			before = tools.is_before(c2, c, prefs)
-			if before == True :
-				pro_el += 1
-			elif before != -1 :
-				neg_el += 1
-		score[N.index(el)] = pro_el-neg_el
-	N2 = [e for e in N]
-	while N2 :
-		tmp = [x for x in N2 if score[N2.index(x)]==max(score)]
-		res.append(tmp)
-		score = [x for x in score if x!=max(score)]
-		N2 = [x for x in N2 if x not in tmp]
-	return res 
\ No newline at end of file
+	pro, neg = banzhaf_counts(tools.to_preorder(prefs).rank_array(N), len(N))
+	return tools.group_by_score(N, pro-neg)
\ No newline at end of file
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+
+import numpy as np
+
+import OL
+import SR
+import tools
+import launch
+
+
+# benchmarked functions: name -> function called on the inputs of get_inputs
+benchmarks = {
+	"OL.minmax": lambda d : OL.minmax(d["order"], d["X"]),
+	"OL.maxmin": lambda d : OL.maxmin(d["order"], d["X"]),
+	"OL.leximin2": lambda d : OL.leximin2(d["order"], d["X"]),
+	"OL.leximax2": lambda d : OL.leximax2(d["order"], d["X"]),
+	"OL.borda_like": lambda d : OL.borda_like(d["order"], d["X"]),
+	"SR.lexcel": lambda d : SR.lexcel(d["prefs"], d["X"]),
+	"SR.CPmaj": lambda d : SR.CPmaj(d["prefs"], d["X"]),
+	"SR.ordinal_banzhaf": lambda d : SR.ordinal_banzhaf(d["prefs"], d["X"]),
+	"tools.join_prefs_ind": lambda d : tools.join_prefs_ind(d["CP"], len(d["X"])),
+	"tools.corrected_CP": lambda d : tools.corrected_CP(d["CP"], d["lex"], d["X"]),
+	"tools.Kendall_Tau": lambda d : tools.Kendall_Tau(d["lex"], d["truth"], d["X"]),
+	"tools.KT_CP": lambda d : tools.KT_CP(d["CP"], d["truth"], d["X"]),
+	"tools.count_inverse": lambda d : tools.count_inverse(d["CP"], d["truth"], d["X"]),
+}
+
+
+# given the population size N and the master seed
+# returns the inputs of the benchmarks, the same for a given seed: a random order over the population X, a partial preorder over half of the coalitions drawn from its leximin extension (as by the tests),
+# and the ranking of lexcel and the dominance matrix of CP-majority over this partial preorder
+# the partial preorder is given as a list of equivalence classes: SR methods build their Preorder (and its rank array) at each call, as in the tests
+def get_inputs(N, seed) :
+	rng = random.Random(repr((seed, N)))
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+	prefs = launch.get_sized_order(2**(N-1), order, X, 3, rng)
+	return {
+		"X": X,
+		"order": order,
+		"prefs": [list(eq) for eq in prefs],
+		"truth": [[x[0]] for x in order],
+		"lex": SR.lexcel(prefs, X),
+		"CP": SR.CP_matrix(prefs, X),
+	}
+
+
+# given a benchmarked function, its inputs, the maximal number of timed calls and a time budget (seconds)
+# returns the number of timed calls, the median and 95th percentile of their wall times (seconds) and the peak of the memory allocated during a call (bytes, measured by tracemalloc on a first untimed call)
+# calls are timed until there are repeats of them or the budget is spent, with at least 3 of them
+def measure(f, d, repeats, budget) :
+	tracemalloc.start()
+	f(d)
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	times = []
+	start = time.perf_counter()
+	while len(times) < repeats and (len(times) < 3 or time.perf_counter()-start < budget) :
+		t = time.perf_counter()
+		f(d)
+		times.append(time.perf_counter()-t)
+	return {"calls": len(times), "median": float(np.median(times)), "p95": float(np.percentile(times, 95)), "peak_memory": peak}
+
+
+# given the population sizes and the median times of a function
+# returns the exponent a such that the median time grows as (2^N)^a, fitted (least squares on log2 of the times) over the largest half of the population sizes, None with fewer than 2 of them
+def get_exponent(Ns, medians) :
+	Ns = Ns[len(Ns)//2:]
+	medians = medians[len(medians)//2:]
+	if len(Ns) < 2 :
+		return None
+	return float(np.polyfit(Ns, np.log2(medians), 1)[0])
+
+
+# returns the commit of the benchmarked revision (None outside of a git repository)
+def get_revision() :
+	try :
+		return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError) :
+		return None
+
+
+# given the names of the benchmarked functions, the population sizes, the maximal number of timed calls and the time budget of each function and size, and the master seed
+# returns the report of the benchmarks (see measure and get_exponent)
+def run_benchmarks(names, Ns, repeats=20, budget=2.0, seed=0) :
+	res = {name: {"N": {}} for name in names}
+	for N in Ns :
+		d = get_inputs(N, seed)
+		for name in names :
+			res[name]["N"][str(N)] = measure(benchmarks[name], d, repeats, budget)
+			r = res[name]["N"][str(N)]
+			print("N = "+str(N)+"\t"+name+"\tmedian "+format(r["median"], ".3g")+" s\tp95 "+format(r["p95"], ".3g")+" s\tpeak "+str(r["peak_memory"]//1024)+" KiB")
+	for name in names :
+		res[name]["exponent"] = get_exponent(list(Ns), [res[name]["N"][str(N)]["median"] for N in Ns])
+	return {
+		"revision": get_revision(),
+		"python": platform.python_version(),
+		"numpy": np.__version__,
+		"platform": platform.platform(),
+		"seed": seed,
+		"repeats": repeats,
+		"budget": budget,
+		"results": res,
+	}
+
+
+# given the command-line arguments
+# runs the benchmarks and saves their report as a json file
+def start(argv) :
+	parser = argparse.ArgumentParser(description="Times the order lifting rules, social ranking methods and metrics on seeded inputs for growing population sizes.")
+	parser.add_argument("--min-N", dest="min_N", type=int, default=4, help="minimum size of population (default: 4)")
+	parser.add_argument("--max-N", dest="max_N", type=int, default=14, help="maximal size of population (default: 14)")
+	parser.add_argument("--functions", nargs="+", choices=list(benchmarks), default=list(benchmarks), help="benchmarked functions (default: all)")
+	parser.add_argument("--repeats", type=int, default=20, help="maximal number of timed calls of each function for each size (default: 20)")
+	parser.add_argument("--budget", type=float, default=2.0, help="time (seconds) after which a function stops being called for a size, once called 3 times (default: 2)")
+	parser.add_argument("--seed", type=int, default=0, help="seed of the inputs (default: 0)")
+	parser.add_argument("--out", default="benchmark.json", help="json file of the report (default: benchmark.json)")
+	args = parser.parse_args(argv)
+	if args.max_N < args.min_N :
+		parser.error("max_N must be larger than min_N")
+	report = run_benchmarks(args.functions, list(range(args.min_N, args.max_N+1)), args.repeats, args.budget, args.seed)
+	with open(args.out, "w") as f :
+		json.dump(report, f, indent=1)
+	print("Report saved in "+args.out)
+
+
+if __name__ == "__main__" :
+	start(sys.argv[1:])
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Kendall-Tau distances over rank vectors: the rank vector of a preorder over a population pop gives, for each element of pop, the index of its equivalence class (-1 if absent)
+# as in tools.is_before, an element is before another if it is in an earlier equivalence class or if only it is present; two absent elements are not related at all
+
+# given a preorder (list of equivalence classes) and a population pop
+# returns its rank vector (list)
+def get_ranks(order, pop) :
+	rank = {}
+	for i in range(len(order)) :
+		for el in order[i] :
+			rank[el] = i
+	return [rank.get(x, -1) for x in pop]
+
+
+# given preorders (list of preorders) over a population pop
+# returns their rank vectors, as an array (preorders x len(pop))
+def get_rank_matrix(orders, pop) :
+	return np.array([get_ranks(order, pop) for order in orders], dtype=np.int64).reshape(len(orders), len(pop))
+
+
+# given a list of pairwise preferences (lists [x,y] signifying that x > y) over a population pop
+# returns its relation matrix: bool array W such that W[i, j] if [pop[i], pop[j]] is in prefs (preferences over elements outside pop are ignored)
+def get_relation(prefs, pop) :
+	index = {pop[i]: i for i in range(len(pop))}
+	W = np.zeros((len(pop), len(pop)), dtype=bool)
+	for x, y in prefs :
+		if x in index and y in index :
+			W[index[x], index[y]] = True
+	return W
+
+
+# given a list of values
+# returns the number of pairs of equal values
+def count_ties(values) :
+	count = {}
+	for v in values :
+		count[v] = count.get(v, 0)+1
+	return sum([c*(c-1)//2 for c in count.values()])
+
+
+# given a list of values
+# returns the values sorted and the number of pairs i < j such that values[i] > values[j] (merge sort)
+def sort_inversions(values) :
+	if len(values) < 2 :
+		return values, 0
+	left, res_l = sort_inversions(values[:len(values)//2])
+	right, res_r = sort_inversions(values[len(values)//2:])
+	res = res_l+res_r
+	merged = []
+	i = 0
+	for x in right :
+		while i < len(left) and left[i] <= x :
+			merged.append(left[i])
+			i += 1
+		# elements of left larger than x
+		res += len(left)-i
+		merged.append(x)
+	return merged+left[i:], res
+
+
+# given the rank vectors a and b of two preorders over the same population
+# returns the (weak) Kendall-Tau distance between them (see tools.Kendall_Tau), in O(n log n)
+# pairs tied in a but not in b, or in b but not in a, plus the discordant pairs among the others
+def distance(a, b) :
+	absent = max([0]+list(a)+list(b))+1
+	# absent elements are placed together after all present ones
+	a = [r if r >= 0 else absent for r in a]
+	b = [r if r >= 0 else absent for r in b]
+	pairs = list(zip(a, b))
+	res = count_ties(a)+count_ties(b)-2*count_ties(pairs)
+	pairs.sort()
+	res += sort_inversions([y for x, y in pairs])[1]
+	# absent elements are not tied: pairs absent in one preorder but tied in the other disagree too
+	res += count_ties([p for p in pairs if (p[0] == absent) != (p[1] == absent)])
+	return res
+
+
+# given a rank matrix (..., n)
+# returns the relation of each pair of elements (..., n, n): 1 if i is before j, -1 if after, 0 if tied, 2 if both absent
+def get_signs(A) :
+	A = np.asarray(A)
+	absent = A.max(initial=0)+1
+	R = np.where(A >= 0, A, absent)
+	signs = np.sign(R[..., None, :]-R[..., :, None])
+	signs[(A[..., :, None] < 0) & (A[..., None, :] < 0)] = 2
+	return signs
+
+
+# given the rank matrices A and B (..., n) of preorders over the same population, e.g. of recovered rankings and of ground truths
+# returns the (weak) Kendall-Tau distance between each pair of preorders A[k], B[k] (see distance), all at once
+def distances(A, B) :
+	n = np.shape(A)[-1]
+	upper = np.triu(np.ones((n, n), dtype=bool), 1)
+	return ((get_signs(A) != get_signs(B)) & upper).sum(axis=(-2, -1))
+
+
+# given the relation matrices W (..., n, n, see get_relation) of pairwise preferences and the rank matrix og (..., n) of preorders over the same population
+# returns the distances of tools.KT_CP between each relation W[k] and preorder og[k]
+# an equivalence counts if the pair is not in a same equivalence class of og, a strict preference if the pair is not strictly in this order in og
+def CP_distances(W, og) :
+	W = np.asarray(W, dtype=bool)
+	og = np.asarray(og)
+	n = og.shape[-1]
+	present = og >= 0
+	both = W & np.swapaxes(W, -1, -2)
+	same = present[..., :, None] & present[..., None, :] & (og[..., :, None] == og[..., None, :])
+	before = present[..., :, None] & (~present[..., None, :] | (og[..., :, None] < og[..., None, :]))
+	upper = np.triu(np.ones((n, n), dtype=bool), 1)
+	return (both & ~same & upper).sum(axis=(-2, -1))+(W & ~both & ~before).sum(axis=(-2, -1))
+
+
+# given the relation matrices W (..., n, n, see get_relation) of pairwise preferences and the rank matrix og (..., n) of preorders over the same population
+# returns the numbers of errors of tools.count_inverse between each relation W[k] and preorder og[k]
+# equivalences are never counted, a strict preference is counted if the pair is in the opposite order in og (ties are not errors)
+def CP_inversions(W, og) :
+	W = np.asarray(W, dtype=bool)
+	og = np.asarray(og)
+	present = og >= 0
+	both = W & np.swapaxes(W, -1, -2)
+	not_after = present[..., :, None] & (~present[..., None, :] | (og[..., :, None] <= og[..., None, :]))
+	return (W & ~both & ~not_after).sum(axis=(-2, -1))
@@ -3,20 +3,50 @@
 import random
 import math
 import os
+import sys
 import csv
-import statistics
+import functools
+import multiprocessing
+import collections
+import argparse
+import json
+import itertools
+import fractions
+import heapq
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 import OL
 import tools
 import SR
+import kendall
+import results
+import timing
+
+
+# percentages of total coalitions tested by default
+default_tests = [0.05] + [i/10 for i in range(1,10)] + [0.99]
+
+
+# matplotlib.pyplot, imported by get_pyplot the first time a plot is drawn
+plt = None
+
+
+# returns matplotlib.pyplot, importing it (with a non-interactive backend, plots being only saved to files) on first use
+# runs that draw no plot (k-sized tests, tests ran without plots) never import matplotlib
+def get_pyplot() :
+	global plt
+	if plt is None :
+		import matplotlib
+		matplotlib.use("Agg")
+		import matplotlib.pyplot
+		plt = matplotlib.pyplot
+	return plt
 
 
 # given an order over a population X and a rule nb
-# returns the extension obtained using the specified rule
-def get_order_from_rule(order, X, rule) :
+# returns the extension obtained by lifting order with the specified rule
+def lift_order(order, X, rule) :
 	if rule == 1 :
 		return OL.minmax(order, X)
 	if rule == 2 :
@@ -38,6 +68,82 @@ def get_order_from_rule(order, X, rule) :
 	return OL.card_ind_u(order, X)
 
 
+# extensions of the identity order of each population, for each rule: (rule, X) -> list of equivalence classes of bitmasks
+lifted = {}
+# for each of these extensions: class of each singleton, and indices of the classes of a single coalition and of the other ones
+classes = {}
+# for each population X: coalition (tuple) encoded by each bitmask, and index of each bitmask in the enumeration of the powerset
+powersets = {}
+
+
+# given a population X
+# returns the coalition (tuple) encoded by each bitmask and the index of each bitmask in the enumeration of the powerset, computed once
+def get_powerset(X) :
+	if tuple(X) not in powersets :
+		masks = tools.generate_powerset_masks(len(X), 0)
+		index = [0 for _ in masks]
+		for i in range(len(masks)) :
+			index[masks[i]] = i
+		powersets[tuple(X)] = ([tools.from_mask(m, X) for m in range(2**len(X))], index)
+	return powersets[tuple(X)]
+
+
+# given a population X and a rule nb
+# returns the extension of the identity order over X (list of equivalence classes of bitmasks), computed once
+def get_lifted(X, rule) :
+	if (rule, tuple(X)) not in lifted :
+		bits = tools.get_bits(X)
+		lifted[(rule, tuple(X))] = [[tools.to_mask(C, bits) for C in eq] for eq in lift_order([(x,) for x in X], X, rule)]
+	return lifted[(rule, tuple(X))]
+
+
+# given a population X and a rule nb
+# returns, in the extension of the identity order over X (see get_lifted), the class of each singleton (bitmask -> index) and the indices of the classes of a single coalition and of the other ones, computed once
+def get_classes(X, rule) :
+	if (rule, tuple(X)) not in classes :
+		eqs = get_lifted(X, rule)
+		single = {C: k for k in range(len(eqs)) for C in eqs[k] if C & (C-1) == 0 and C != 0}
+		classes[(rule, tuple(X))] = (single, [k for k in range(len(eqs)) if len(eqs[k]) == 1], [k for k in range(len(eqs)) if len(eqs[k]) > 1])
+	return classes[(rule, tuple(X))]
+
+
+# given orders over a population X (one per row)
+# returns the array img (orders x 2^n) such that img[t, m] is the image of bitmask m when bit k is replaced by the bit of the k-th element of the t-th order
+def get_images(orders, X) :
+	bits = tools.get_bits(X)
+	# image[t, k]: bit of the k-th element of the t-th order
+	image = np.array([[bits[x[0]] for x in order] for order in orders], dtype=np.int64).reshape(len(orders), len(X))
+	m = np.arange(2**len(X))
+	img = np.zeros((len(orders), 2**len(X)), dtype=np.int64)
+	for k in range(len(X)) :
+		img |= ((m >> k) & 1)[None,:] * image[:, k:k+1]
+	return img
+
+
+# given an order over a population X and a rule nb
+# returns the extension obtained using the specified rule
+# all rules being neutral, it is the extension of the identity order (computed once) where the k-th element of X is replaced by the k-th element of order
+def get_order_from_rule(order, X, rule) :
+	coals, index = get_powerset(X)
+	img = get_images([order], X)[0].tolist()
+	# coalitions of each equivalence class are kept in the order in which lift_order enumerates them
+	return [[coals[c] for c in sorted([img[c] for c in eq], key=index.__getitem__)] for eq in get_lifted(X, rule)]
+
+
+# given a rank array over the coalitions of X (see tools.Preorder.rank_array)
+# returns the Preorder it encodes, coalitions of each equivalence class in the order in which lift_order enumerates them (its rank array is the given one)
+def get_preorder(rank, X) :
+	coals, index = get_powerset(X)
+	masks = np.nonzero(rank >= 0)[0]
+	masks = masks[np.argsort(np.asarray(index)[masks])]
+	order = [[] for _ in range(int(rank.max())+1)]
+	for m, r in zip(masks.tolist(), rank[masks].tolist()) :
+		order[r].append(coals[m])
+	res = tools.Preorder(order)
+	res.arrays[tuple(X)] = rank
+	return res
+
+
 # given the rule number
 # returns the name of the rule (empty string if incorrect rule number)
 def get_rule_name(rule) :
@@ -54,44 +160,817 @@ def get_rule_name(rule) :
 	return ""
 
 
-# given the required size of the output order, the complete order, the population X and the number of the rule used
-# returns a partial preorder compatible with order of size s and such that at least two singletons are absent
-def get_sized_order(s, order, X, rule) :
-	res = get_order_from_rule(order, X, rule)
-	nb_c = 2**len(X)
-	# empty set not considered for maxmin and minmax (rules 1 and 2)
-	if rule < 3 :
-		nb_c -= 1
+# given a random generator
+# returns a float uniform in (0, 1)
+def get_uniform(rng) :
+	return (rng.getrandbits(53)+0.5)*2.0**-53
+
+
+# fraction of the coalitions below which get_sized_ranks draws the kept coalitions directly (see get_direct_ranks), counting the classes of more than one coalition, whose rings are all drawn: above it, drawing the removals of all coalitions at once is faster
+direct_fraction = 0.05
+
+
+# given the required size of the output order, the complete order, the population X, the number of the rule used and the random generator of the trial
+# returns a partial preorder compatible with order of size s and such that at least two singletons are absent (see get_sized_ranks)
+def get_sized_order(s, order, X, rule, rng=random) :
+	return get_preorder(get_sized_ranks(s, [order], X, rule, [rng.getrandbits(64)])[0], X)
+
+
+# given the required size of the output order, the population X, the number of the rule used and the random generator of the trial
+# returns the classes (in the extension of the identity order over X, see get_lifted) and the bitmasks of the coalitions of a partial preorder of size s compatible with the identity order, such that at least two singletons are absent,
+# drawn as by get_sized_ranks (same distribution, other draws)
+# only the kept coalitions are drawn, in O(s log s) (plus the number of classes of more than one coalition): the rings of the clocks of get_removals are drawn backwards from the last one, and the coalitions ringing last are kept
+# the last ring of a class of z coalitions follows a Gamma(z, 1) law and, given a ring, the j earlier ones are uniform below it (the latest of them being ring*U^(1/j))
+# classes of a single coalition are drawn together: the last rings among k of them are the largest of k exponential times, i.e. -log(1-V) where V is the largest of k uniforms
+def get_direct_kept(s, X, rule, rng=random) :
+	n = len(X)
+	eqs = get_lifted(X, rule)
+	single, ones, big = get_classes(X, rule)
 	# in our case, any partial preorder containing all singletons makes the problem trivial: we require that at least two singletons be missing
-	for _ in range(2) :
-		sing = tuple([random.choice(X)])
-		for eq in res :
-			if sing in eq :
-				eq.remove(sing)
-				break
-		# remove any eventual empty equivalence class
-		res = [eq for eq in res if eq]
-	nb_c -= 2
-	while nb_c > s :
-		i = random.randint(0,len(res)-1)
-		# if it's the only element in its equivalence class, we remove the entire equivalence class
-		if len(res[i]) == 1 :
-			res.pop(i)
-		# otherwise we remove just one coalition from the equivalence class
+	# they are drawn among the singletons of the extension of the identity order, whose k-th element is then replaced by the k-th element of the order of the trial (see get_direct_ranks)
+	missing = set([1 << rng.randrange(n), 1 << rng.randrange(n)])
+	# number of coalitions left in the classes of the missing singletons
+	left = {}
+	for C in missing :
+		left[single[C]] = left.get(single[C], len(eqs[single[C]]))-1
+	kept = min(s, get_nb_coalitions(n, rule))+2-len(missing)
+
+	# classes of a single coalition: those of the extension (but those emptied by the missing singletons, skipped when drawn) and those left with a single coalition
+	extra = [k for k in left if len(eqs[k]) > 1 and left[k] == 1]
+	empty = set([k for k in left if len(eqs[k]) == 1 and left[k] == 0])
+	nb_ones = len(ones)-len(empty)+len(extra)
+	# next rings: (-ring, class, number of rings left in the class), the class -1 standing for all the classes of a single coalition
+	rings = [(-rng.gammavariate(left.get(k, len(eqs[k])), 1.0), k, left.get(k, len(eqs[k]))) for k in big if left.get(k, len(eqs[k])) > 1]
+	# logarithm of the largest of the uniforms of the classes of a single coalition not drawn yet
+	log_v = 0.0
+	if nb_ones > 0 :
+		log_v = math.log(get_uniform(rng))/nb_ones
+		rings.append((math.log(-math.expm1(log_v)), -1, nb_ones))
+	heapq.heapify(rings)
+	# states of the shuffles drawing the classes of a single coalition and the coalitions of the other classes (see draw_next)
+	singles = ones+extra
+	shuffles = {-1: [{}, 0]}
+	res = []
+	while len(res) < kept and rings :
+		ring, k, j = heapq.heappop(rings)
+		if k == -1 :
+			c = draw_next(singles, shuffles[-1], rng, empty)
+			res.append((c, [C for C in eqs[c] if C not in missing][0]))
+			if j > 1 :
+				log_v += math.log(get_uniform(rng))/(j-1)
+				heapq.heappush(rings, (math.log(-math.expm1(log_v)), -1, j-1))
 		else :
-			res[i].remove(random.choice(res[i]))
-		nb_c -= 1
+			if k not in shuffles :
+				shuffles[k] = [{}, 0]
+			res.append((k, draw_next(eqs[k], shuffles[k], rng, missing)))
+			if j > 1 :
+				heapq.heappush(rings, (ring*get_uniform(rng)**(1/(j-1)), k, j-1))
+
+	return [k for k, C in res], [C for k, C in res]
+
+
+# given a list, the state [positions moved: position -> element, number of elements drawn] of a partial Fisher-Yates shuffle of it, a random generator and elements to skip
+# returns an element drawn uniformly among those neither drawn yet nor skipped, updating the state (the list is left untouched)
+def draw_next(pool, state, rng, skip) :
+	moved = state[0]
+	while True :
+		i = rng.randrange(state[1], len(pool))
+		x = moved.get(i, pool[i])
+		moved[i] = moved.get(state[1], pool[state[1]])
+		state[1] += 1
+		if x not in skip :
+			return x
+
+
+# given the required size s of the output orders, the complete orders of a batch of trials (over the population X), the number of the rule used and the random key of each trial
+# returns the rank arrays (trials x 2^n, see tools.Preorder.rank_array) of partial preorders compatible with the orders, each drawn by get_direct_kept from its key
+# the k-th element of X is replaced by the k-th element of the order in the kept coalitions only, for all trials at once
+def get_direct_ranks(s, orders, X, rule, keys) :
+	n = len(X)
+	bits = tools.get_bits(X)
+	# trial, class and bitmask of each kept coalition
+	tr = []
+	cls = []
+	masks = []
+	for t in range(len(orders)) :
+		c, m = get_direct_kept(s, X, rule, random.Random(int(keys[t])))
+		tr += [t]*len(c)
+		cls += c
+		masks += m
+	tr = np.array(tr, dtype=np.int64)
+	cls = np.array(cls, dtype=np.int64)
+	masks = np.array(masks, dtype=np.int64)
+	perm = np.array([[bits[o[b][0]] for b in range(n)] for o in orders], dtype=np.int64).reshape(len(orders), n)
+	img = np.zeros(len(masks), dtype=np.int64)
+	for b in range(n) :
+		img |= ((masks >> b) & 1)*perm[tr, b]
+	# remaining equivalence classes are numbered in order, in each trial
+	pos = np.lexsort((cls, tr))
+	tr = tr[pos]
+	cls = cls[pos]
+	new = np.ones(len(pos), dtype=bool)
+	new[1:] = (tr[1:] != tr[:-1]) | (cls[1:] != cls[:-1])
+	num = np.cumsum(new)-1
+	res = np.full((len(orders), 2**n), -1, dtype=np.int32)
+	res[tr, img[pos]] = num-num[np.searchsorted(tr, tr)]
+	return res
+
+
+# given the complete orders of a batch of trials (over the population X), the number of the rule used and the random key of each trial
+# returns the equivalence class eq[t, m] of each coalition m in the extension of the t-th order (-1 if absent, e.g. the emptyset for minmax and maxmin or the two singletons drawn for the trial) and the time ring[t, m] at which it is removed (inf if absent)
+# two singletons are drawn (with replacement), then each removal picks an equivalence class uniformly among the non-empty ones, then a coalition uniformly in it: this is drawn at once by giving each non-empty class a clock ringing at rate 1,
+# its coalitions being removed in a random order at its rings
+# the removals of a trial only depend on its order and key, not on the other trials of the batch
+def get_removals(orders, X, rule, keys) :
+	n = len(X)
+	nb_t = len(orders)
+	eqs = get_lifted(X, rule)
+	cls = np.full(2**n, -1, dtype=np.int64)
+	for k in range(len(eqs)) :
+		cls[eqs[k]] = k
+	t = np.arange(nb_t)[:,None]
+	eq = np.empty((nb_t, 2**n), dtype=np.int64)
+	eq[t, get_images(orders, X)] = cls
+	u = tools.uniforms(np.asarray(keys, dtype=np.uint64), 2+2*2**n)
+
+	# in our case, any partial preorder containing all singletons makes the problem trivial: we require that at least two singletons be missing
+	eq[t, 1 << (u[:, :2]*n).astype(np.int64)] = -1
+	present = eq >= 0
+	# coalitions sorted by equivalence class, in a random order within each class (absent ones last)
+	pos = np.argsort(np.where(present, eq+u[:, 2:2+2**n], np.inf), axis=1)
+	eq_s = np.take_along_axis(eq, pos, axis=1)
+	# rings of the clocks: sums of exponential waiting times, restarting at each class
+	wait = -np.log1p(-u[:, 2+2**n:])
+	ring = np.cumsum(wait, axis=1)
+	first = np.ones(eq_s.shape, dtype=bool)
+	first[:, 1:] = eq_s[:, 1:] != eq_s[:, :-1]
+	start = np.maximum.accumulate(np.where(first, np.arange(2**n), 0), axis=1)
+	ring = ring-np.take_along_axis(ring-wait, start, axis=1)
+	ring[eq_s < 0] = np.inf
+	res = np.empty(ring.shape)
+	res[t, pos] = ring
+	return eq, res
+
+
+# given the population size n and the number of the rule used
+# returns the number of coalitions partial preorders are drawn from (the emptyset is not considered for maxmin and minmax, rules 1 and 2)
+def get_nb_coalitions(n, rule) :
+	if rule < 3 :
+		return 2**n-3
+	return 2**n-2
+
+
+# given the required size s of the output orders, the complete orders of a batch of trials (over the population X), the number of the rule used and the random key of each trial
+# returns the rank arrays (trials x 2^n, see tools.Preorder.rank_array) of partial preorders compatible with the orders, drawn all at once
+# in each trial, two singletons are drawn (with replacement) and removed, then coalitions are removed one at a time until s remain (s+1 if the same singleton was drawn twice), as drawn by get_removals
+# below direct_fraction of the coalitions (see get_direct_kept), only the kept coalitions are drawn, by get_direct_ranks
+def get_sized_ranks(s, orders, X, rule, keys) :
+	if s+len(get_classes(X, rule)[2]) < direct_fraction*2**len(X) :
+		return get_direct_ranks(s, orders, X, rule, keys)
+	nb_t = len(orders)
+	eq, ring = get_removals(orders, X, rule, keys)
+	removed = get_nb_coalitions(len(X), rule)-s
+	present = eq >= 0
+	if removed > 0 :
+		# coalitions still there after the first removals
+		last = np.partition(ring, removed-1, axis=1)[:, removed-1:removed]
+		present &= ring > last
+	# remaining equivalence classes are numbered in order
+	alive = np.zeros((nb_t, len(get_lifted(X, rule))), dtype=bool)
+	alive[np.nonzero(present)[0], eq[present]] = True
+	num = np.cumsum(alive, axis=1)-1
+	return np.where(present, np.take_along_axis(num, np.maximum(eq, 0), axis=1), -1).astype(np.int32)
+
+
+# given the equivalence classes and removal times of the coalitions of a batch of trials over the population X (see get_removals), the required sizes (increasing) and the number of the rule used
+# returns the array steps (trials x 2^n) such that coalition m is in the partial preorder of size sizes[g] drawn by get_sized_ranks from the same removals if and only if g >= steps[t, m] (len(sizes) if it is in none)
+# the partial preorders of the increasing sizes are nested: coalitions arrive in the reverse order of their removals
+def get_arrival_steps(eq, ring, sizes, X, rule) :
+	nb_t = eq.shape[0]
+	present = eq >= 0
+	# number of present coalitions removed after each one
+	pos = np.argsort(np.where(present, -ring, np.inf), axis=1)
+	later = np.empty(pos.shape, dtype=np.int64)
+	later[np.arange(nb_t)[:,None], pos] = np.arange(eq.shape[1])
+	# a coalition is kept for size s if fewer than s-(nb_c-present.sum()) coalitions are removed after it
+	later += get_nb_coalitions(len(X), rule)-present.sum(axis=1, keepdims=True)
+	steps = np.searchsorted(np.asarray(sizes), later, side="right")
+	steps[~present] = len(sizes)
+	return steps
+
+
+# maximal number of partial preorders enumerated by the exact mode for a given size (see get_sized_distribution), beyond which runs are sampled instead
+exact_limit = 100000
+# largest population size for which the exact mode enumerates partial preorders: with the limit above, it covers every size for N = 4 and only the smallest and largest sizes for N = 5,
+# and beyond that every size has too many partial preorders (counting them to find out already takes longer than sampling the runs)
+exact_max_N = 5
+
+
+# given a histogram (list: value -> number of times it appears)
+# yields the distinct sequences (tuples) in which these values can be arranged
+def get_arrangements(hist) :
+	if not any(hist) :
+		yield ()
+		return
+	for v in range(len(hist)) :
+		if hist[v] > 0 :
+			hist[v] -= 1
+			for rest in get_arrangements(hist) :
+				yield (v,)+rest
+			hist[v] += 1
+
+
+# given the number of classes of a size z left with 0, 1, ..., z coalitions (histogram h)
+# returns the number of ways of giving these numbers to the classes, then of keeping these numbers of coalitions in each class
+def count_kept(h) :
+	res = math.factorial(sum(h))
+	for c in range(len(h)) :
+		res = res//math.factorial(h[c])*math.comb(len(h)-1, c)**h[c]
+	return res
+
+
+# given the required size s of the output order, the population X and the number of the rule used
+# returns the distribution of the partial preorders drawn by get_sized_ranks from the identity order over X (dict: tuple of the equivalence classes of kept bitmasks -> probability as a Fraction), None if it has more than limit partial preorders
+# each removal picks a non-empty class uniformly, whatever the number of coalitions left in it: classes of a same size are interchangeable, and the removals are followed exactly by counting, for each size, the classes left with each number of coalitions
+# all the ways of giving these numbers to the classes of a size, then of keeping these numbers of coalitions in each class, are then equally likely
+def get_sized_distribution(s, X, rule, limit=exact_limit) :
+	n = len(X)
+	nb_c = get_nb_coalitions(n, rule)
+	# for each pair of removed singletons: present classes, their sizes and the probability of each state after the removals
+	groups = []
+	total = 0
+	for a in range(n) :
+		for b in range(a, n) :
+			cls = [[C for C in eq if C not in [1 << a, 1 << b]] for eq in get_lifted(X, rule)]
+			cls = [eq for eq in cls if eq]
+			sizes = sorted(set([len(eq) for eq in cls]))
+			# state: for each size z, the number of classes of size z left with 0, 1, ..., z coalitions
+			start = tuple([tuple([0]*z+[len([eq for eq in cls if len(eq) == z])]) for z in sizes])
+			# probabilities are kept as numerators over a common denominator den (each pair of distinct singletons is drawn in two orders)
+			states = {start: 1 if a == b else 2}
+			den = n*n
+			for i in range(nb_c-s) :
+				# numbers of non-empty classes
+				nz = {state: sum([sum(h[1:]) for h in state]) for state in states}
+				lcm = math.lcm(*nz.values())
+				new = collections.defaultdict(int)
+				for state, p in states.items() :
+					for k in range(len(state)) :
+						for c in range(1, len(state[k])) :
+							if state[k][c] > 0 :
+								h = list(state[k])
+								h[c] -= 1
+								h[c-1] += 1
+								new[state[:k]+(tuple(h),)+state[k+1:]] += p*state[k][c]*(lcm//nz[state])
+				states = new
+				den *= lcm
+			groups.append((cls, sizes, {state: fractions.Fraction(p, den) for state, p in states.items()}))
+			total += sum([math.prod([count_kept(h) for h in state]) for state in states])
+			if total > limit :
+				return None
+
+	res = collections.defaultdict(fractions.Fraction)
+	for cls, sizes, states in groups :
+		for state, p in states.items() :
+			q = p/math.prod([count_kept(h) for h in state])
+			# number of coalitions kept in each class of each size, for every way of arranging them
+			for arrangement in itertools.product(*[list(get_arrangements(list(h))) for h in state]) :
+				kept = {}
+				for k in range(len(sizes)) :
+					for eq, c in zip([eq for eq in cls if len(eq) == sizes[k]], arrangement[k]) :
+						kept[eq[0]] = list(itertools.combinations(eq, c))
+				for choice in itertools.product(*[kept[eq[0]] for eq in cls]) :
+					res[tuple([eq for eq in choice if eq])] += q
+	return res
+
+
+# given the required number s of coalitions of size k, the complete order, the population X, the number of the rule used and the random generator of the trial
+# returns a partial preorder compatible with order over s coalitions of size k
+def get_k_sized_order(s, k, order, X, rule, rng=random) :
+	res = get_order_from_rule(order, X, rule)
+	res2 = []
+	for eq in res :
+		tmp = [el for el in eq if len(el)==k]
+		if tmp :
+			res2.append(tmp)
+	while len(res2) > s :
+		res2.pop(rng.randint(0,len(res2)-1))
+	return tools.Preorder(res2)
+
+
+# given a master seed and the key of a trial (its arguments, i.e. rule, N, [k,] size, and the index of the run)
+# returns the random generator of the trial: the random module without master seed, otherwise a generator of its own seeded from (seed, key) only
+# any trial can then be ran again alone (in any process, in any order) and draw the same numbers
+def get_rng(seed, key) :
+	if seed is None :
+		return random
+	return random.Random(repr((seed,)+key))
+
+
+# given a trial function, the tuple args of its arguments, a master seed, the index start of the first run and the number of runs
+# returns the list of the results of the runs, each with its own random generator if a master seed is given
+# trials having a batch version (see batches) are ran all at once, with the same results
+def run_batch(trial, args, seed, start, nb_runs) :
+	if timing.is_enabled() :
+		timing.set_config(*args[:2])
+	rngs = [get_rng(seed, args+(i,)) for i in range(start, start+nb_runs)]
+	if trial in batches :
+		return batches[trial](*args, rngs)
+	return [trial(*args, rng) for rng in rngs]
+
+
+# given a trial function, the tuple args of its arguments, the number of runs, a pool of worker processes (None to run in this process), a master seed and the index of the first run
+# returns the list of the results of the nb_runs runs, in order
+# with a master seed, each run is seeded on its own: the results do not depend on the number of workers
+def run_trials(trial, args, nb_runs, pool=None, seed=None, start=0) :
+	if pool is None :
+		return run_batch(trial, args, seed, start, nb_runs)
+	# workers would otherwise share the same random state
+	if seed is None :
+		seed = random.getrandbits(64)
+	chunk = max(1, nb_runs // (4*(os.cpu_count() or 1)))
+	chunks = [(i, min(chunk, start+nb_runs-i)) for i in range(start, start+nb_runs, chunk)]
+	if timing.is_enabled() :
+		parts = []
+		for part, times in pool.starmap(functools.partial(run_batch_timed, trial, args, seed), chunks) :
+			timing.add(times)
+			parts.append(part)
+	else :
+		parts = pool.starmap(functools.partial(run_batch, trial, args, seed), chunks)
+	return [r for part in parts for r in part]
+
+
+# given the arguments of run_batch
+# returns its results and the times spent in each stage by this worker process since its last batch, to be added to those of the main process (see timing)
+def run_batch_timed(trial, args, seed, start, nb_runs) :
+	res = run_batch(trial, args, seed, start, nb_runs)
+	return res, timing.collect()
+
+
+# returns the stages timed with timings (see timing.enable): stage -> functions (module or class, name) whose calls are part of it
+# a stage includes the stages ran within it (e.g. lifting within truncation for k-sized coalitions, every stage within total)
+def get_stages() :
+	this = sys.modules[__name__]
+	return {
+		"lifting": [(this, "lift_order"), (this, "get_order_from_rule")],
+		"truncation": [(this, "get_sized_ranks"), (this, "get_removals"), (this, "get_arrival_steps"), (this, "get_preorder"), (this, "get_k_sized_order"), (this, "get_sized_distribution")],
+		"lexcel": [(SR, "lexcel"), (SR, "lexcel_nested")],
+		"CP-majority": [(SR, "CP_matrix"), (SR, "CP_matrices"), (SR, "CPmaj"), (SR, "CP_tallies_nested"), (SR, "CP_dominance")],
+		"join_prefs_ind": [(tools, "join_prefs_ind")],
+		"ordinal Banzhaf": [(SR, "ordinal_banzhaf"), (SR, "banzhaf_counts"), (SR, "banzhaf_counts_nested")],
+		"corrected CP": [(tools, "corrected_CP")],
+		"KT metrics": [(kendall, "get_rank_matrix"), (kendall, "distances"), (kendall, "CP_distances"), (kendall, "CP_inversions"), (tools, "Kendall_Tau"), (tools, "KT_CP"), (tools, "count_inverse")],
+		"streams": [(results.Stream, "write"), (results.Stream, "load")],
+		"rendering": [(this, name) for name in ["plot_exact", "plot_win", "plot_KT", "plot_errors", "plot_KT_sr_CP", "plot_errors_sr_CP"]],
+		"total": [(this, "run_config")],
+	}
+
+
+# times the stages of get_stages, e.g. in each worker process
+def enable_timings() :
+	timing.enable(get_stages())
+
+
+# data folder (in out/data) and file suffix of each measure
+outputs = {
+	"exact": ("exact", ""),
+	"win": ("win", "_win"),
+	"KT": ("KT", "_KT"),
+	"errors": ("errors", "_errors"),
+	"KT_sr_CP": ("comb", "_comb_KT"),
+	"errors_sr_CP": ("comb", "_comb_errors"),
+	"k-sized/exact": ("k-sized/exact", ""),
+	"k-sized/win": ("k-sized/win", "_win"),
+	"k-sized/KT": ("k-sized/KT", "_KT"),
+}
+
+
+# given a measure, the rule number and the population size N
+# returns the name of the files of the measure (without extension)
+def get_file_name(measure, rule, N) :
+	return 'N'+str(N)+'_'+get_rule_name(rule)+outputs[measure][1]
+
+
+# given a measure, the rule number, the population size N, the number of runs per block, the master seed and whether runs are nested (see run_sweep)
+# returns the stream in which the per-run results of the measure are saved, picking up the blocks written by a previous launch
+# nested runs are different runs: they are saved apart
+def get_stream(measure, rule, N, block, seed, nested=False) :
+	return results.Stream('out/data/'+outputs[measure][0]+('/stream/nested/' if nested else '/stream/')+get_file_name(measure, rule, N), block, seed)
+
+
+# given a measure and the population size N
+# returns the largest possible result of a run (1 for recoveries, the number of pairs of individuals for distances and errors)
+def get_scale(measure, N) :
+	if measure.endswith("exact") or measure.endswith("win") :
+		return 1
+	return N*(N-1)//2
+
+
+# given the streams of the measured results (measure -> Stream), a trial function, the tuple args of its arguments (rule, N, ..., also the key of the tested configuration), the number of runs, a pool and a master seed
+# runs the trials block after block, each block being written to the streams as soon as it is over (blocks written by a previous launch are reloaded instead)
+# with a tolerance, stops after the first block at which the confidence interval of the rate (result divided by its scale, see get_scale) of every measure and method is no wider than tolerance on each side (see results.get_half_width)
+# returns for each measure and each method the histogram (Counter: result -> number of runs) of the results
+def run_cell(streams, trial, args, nb_runs, pool=None, seed=None, tolerance=None) :
+	block = list(streams.values())[0].block
+	hist = {m: None for m in streams}
+	for b in range(results.get_nb_blocks(nb_runs, block)) :
+		n = results.get_block_len(b, nb_runs, block)
+		todo = [m for m in streams if not streams[m].is_done(args, b, n)]
+		if todo :
+			runs = run_trials(trial, args, n, pool, seed, b*block)
+		for m in streams :
+			if m in todo :
+				# trials measuring several things at once return a dict of results
+				rows = [r[m] if isinstance(r, dict) else r for r in runs]
+				streams[m].write(args, b, rows)
+			else :
+				rows = streams[m].load(args, b, n)
+			if hist[m] is None :
+				hist[m] = [collections.Counter() for _ in rows[0]]
+			for r in rows :
+				for j in range(len(r)) :
+					hist[m][j][r[j]] += 1
+		if tolerance is not None and max([results.get_half_width(h, get_scale(m, args[1])) for m in hist for h in hist[m]]) <= tolerance :
+			break
+	return hist
+
+
+# given the streams of the measured results (measure -> Stream), the rule number, the population size N, the tested sizes (increasing), the number of runs, a pool and a master seed
+# runs the trials of trial_nested block after block, each run giving the results of every size over nested partial preorders, and writes the results of each size to the streams under the key (rule, N, size) (blocks written by a previous launch are reloaded instead)
+# the recovery of the exact order is only measured for the sizes testinfo_exact tests
+# with a tolerance, stops after the first block at which every size is within tolerance (see run_cell)
+# returns for each size, each measure and each method the histogram (Counter: result -> number of runs) of the results
+def run_sweep(streams, rule, N, sizes, nb_runs, pool=None, seed=None, tolerance=None) :
+	block = list(streams.values())[0].block
+	cells = [(m, size) for size in sizes for m in streams if m != "exact" or size < 2**N-2]
+	hist = {c: None for c in cells}
+	for b in range(results.get_nb_blocks(nb_runs, block)) :
+		n = results.get_block_len(b, nb_runs, block)
+		todo = [(m, size) for m, size in cells if not streams[m].is_done((rule, N, size), b, n)]
+		if todo :
+			runs = run_trials(trial_nested, (rule, N, tuple(sizes)), n, pool, seed, b*block)
+		for m, size in cells :
+			if (m, size) in todo :
+				rows = [r[size][m] for r in runs]
+				streams[m].write((rule, N, size), b, rows)
+			else :
+				rows = streams[m].load((rule, N, size), b, n)
+			if hist[(m, size)] is None :
+				hist[(m, size)] = [collections.Counter() for _ in rows[0]]
+			for r in rows :
+				for j in range(len(r)) :
+					hist[(m, size)][j][r[j]] += 1
+		if tolerance is not None and max([results.get_half_width(h, get_scale(m, N)) for m, size in cells for h in hist[(m, size)]]) <= tolerance :
+			break
+	return {size: {m: hist[(m, size)] for m in streams if (m, size) in hist} for size in sizes}
+
+
+# given the histograms of the results of a cell (one per method, results being 0 or 1) and the number of runs
+# returns the number of runs for which each method gets 1, counted over nb_runs runs (expected number if the cell was stopped before, see run_cell), as int when exact
+def get_counts(hist, nb_runs) :
+	runs = sum(hist[0].values())
+	return get_expected(nb_runs, [fractions.Fraction(h[1], runs) for h in hist])
+
+
+# given the number of runs of the tests, the number of runs of each cell (None if they all have nb_runs) and whether the results are scaled to nb_runs (counts) or not (distributions)
+# returns the number of runs given in the title of the plots
+def get_runs_label(nb_runs, runs=None, scaled=True) :
+	if runs is None or min(runs+[nb_runs]) == max(runs+[nb_runs]) :
+		return str(nb_runs)+" runs"
+	label = str(runs[0]) if min(runs) == max(runs) else str(min(runs))+" to "+str(max(runs))
+	if scaled :
+		return label+" runs scaled to "+str(nb_runs)
+	return label+" runs"
+
+
+# given a measure, the rule number, the population size N, the names of the labels of the cells and the cells (labels, then the histograms of the results of each method)
+# saves the number of runs of each cell and the precision achieved for each method (half-width of the confidence interval of its rate, see run_cell)
+def save_precision(measure, rule, N, header, cells) :
+	folder = 'out/data/'+outputs[measure][0]
+	if not os.path.exists(folder) :
+		os.makedirs(folder)
+	with open(folder+'/'+get_file_name(measure, rule, N)+'_precision.csv', 'w') as f :
+		pen = csv.writer(f, delimiter=';')
+		pen.writerow(header+['Runs', 'Half-width of the 95% confidence interval of each rate'])
+		pen.writerows([cell[:-1]+[sum(cell[-1][0].values()), [results.get_half_width(h, get_scale(measure, N)) for h in cell[-1]]] for cell in cells])
+
+
+# one run of testinfo_exact over a partial preorder of size size
+# returns for lexcel, CP-majority and ordinal Banzhaf whether the exact order is recovered (1) or not (0)
+def trial_exact(rule, N, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+
+	# removals drawn from a key of the trial (see get_removals)
+	ranks = get_sized_ranks(size, [order], X, rule, [rng.getrandbits(64)])
+	return exact_recoveries(ranks, X, [order])[0]
+
+
+# given the rank arrays (runs x 2^n, see tools.Preorder.rank_array) of partial preorders over the coalitions of the population X and the orders over X they are compatible with
+# returns for each run whether lexcel, CP-majority and ordinal Banzhaf recover the exact order (1) or not (0)
+def exact_recoveries(ranks, X, orders) :
+	N = len(X)
+	# CP-MAJORITY
+	# dominance matrices of pairwise preferences (not necessarily transitive), for all runs at once
+	pref_CP = SR.CP_matrices(ranks, N)
+	# ORDINAL BANZHAF
+	# scores of all runs at once, ranked as by SR.ordinal_banzhaf
+	pro, neg = SR.banzhaf_counts(ranks, N)
+	res = []
+	for t in range(len(orders)) :
+		truth = tools.Preorder([[x[0]] for x in orders[t]])
+		# LEXCEL
+		# returns list of equivalence classes to express ranking over elements
+		o_lex = SR.lexcel(get_preorder(ranks[t], X), X)
+		o_CP = tools.join_prefs_ind(pref_CP[t],N)
+		o_ban = tools.group_by_score(X, pro[t]-neg[t])
+		res.append([int(o_lex == truth), int(o_CP == truth), int(o_ban == truth)])
+	return res
+
+
+# given the rule, the population size N and the size of the partial preorders
+# returns the probabilities (Fractions) that lexcel, CP-majority and ordinal Banzhaf recover the exact order, computed over all the partial preorders trial_exact may draw (None if there are too many, see get_sized_distribution)
+# all rules and SR methods being neutral, the probabilities are the same for every order: only partial preorders compatible with the identity order are enumerated
+def get_exact_recovery(rule, N, size) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	dist = get_sized_distribution(size, X, rule) if N <= exact_max_N else None
+	if dist is None :
+		print("Too many partial preorders of size "+str(size)+" to enumerate them: runs are sampled")
+		return None
+	dist = list(dist.items())
+	res = [fractions.Fraction(0) for _ in range(3)]
+	# partial preorders are evaluated by blocks, as runs are
+	for b in range(0, len(dist), 1000) :
+		ranks = np.full((min(1000, len(dist)-b), 2**N), -1, dtype=np.int32)
+		for t in range(len(ranks)) :
+			kept = dist[b+t][0]
+			for r in range(len(kept)) :
+				ranks[t, list(kept[r])] = r
+		for t, rec in enumerate(exact_recoveries(ranks, X, [order]*len(ranks))) :
+			res = [res[j]+dist[b+t][1]*rec[j] for j in range(3)]
 	return res
 
 
+# given the number of runs and exact probabilities (Fractions)
+# returns the expected numbers of runs, as int when exact
+def get_expected(nb_runs, probabilities) :
+	return [int(x) if x.denominator == 1 else float(x) for x in [nb_runs*p for p in probabilities]]
+
+
+# one run of testinfo_win over a partial preorder of size size
+# returns for lexcel, CP-majority and ordinal Banzhaf whether the top item is recovered as the unique winner (1) or not (0)
+def trial_win(rule, N, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+
+	res = get_sized_order(size, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res, X)
+	pref_CP = SR.CP_matrix(res, X)
+	o_CP = tools.join_prefs_ind(pref_CP,N)
+	o_ban = SR.ordinal_banzhaf(res,X)
+	return [int(len(o[0]) == 1 and o[0][0] == order[0][0]) for o in [o_lex, o_CP, o_ban]]
+
+
+# one run of testinfo_KT over a partial preorder of size size
+# returns the (weak) Kendall-Tau distances to the ground truth of lexcel, CP-majority and ordinal Banzhaf
+def trial_KT(rule, N, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+	truth = tools.Preorder([[x[0]] for x in order])
+
+	res = get_sized_order(size, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res, X)
+	pref_CP = SR.CP_matrix(res, X)
+	o_ban = SR.ordinal_banzhaf(res,X)
+	return [tools.Kendall_Tau(o_lex, truth, X), tools.KT_CP(pref_CP, truth, X), tools.Kendall_Tau(o_ban, truth, X)]
+
+
+# one run of testinfo_errors over a partial preorder of size size
+# returns the number of errors of lexcel, CP-majority and ordinal Banzhaf with respect to the ground truth
+def trial_errors(rule, N, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+	truth = tools.Preorder([[x[0]] for x in order])
+
+	res = get_sized_order(size, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res, X)
+	pref_CP = SR.CP_matrix(res, X)
+	o_ban = SR.ordinal_banzhaf(res,X)
+	return [tools.Kendall_Tau(o_lex, truth, X), tools.count_inverse(pref_CP, truth, X), tools.Kendall_Tau(o_ban, truth, X)]
+
+
+# one run of testinfo_KT_sr_CP over a partial preorder of size size
+# returns the (weak) Kendall-Tau distances to the ground truth of lexcel, CP-majority, and CP-majority corrected by lexcel and by ordinal Banzhaf
+def trial_KT_sr_CP(rule, N, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+	truth = tools.Preorder([[x[0]] for x in order])
+
+	res = get_sized_order(size, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res, X)
+	pref_CP = SR.CP_matrix(res, X)
+	# LEXCEL CORRECTED WITH CP
+	o_comb_lex = tools.corrected_CP(pref_CP, o_lex, X)
+	# ORDINAL BANZHAF CORRECTED WITH CP
+	o_ban = SR.ordinal_banzhaf(res,X)
+	o_comb_ob = tools.corrected_CP(pref_CP, o_ban, X)
+	return [tools.Kendall_Tau(o_lex, truth, X), tools.KT_CP(pref_CP, truth, X), tools.KT_CP(o_comb_lex, truth, X), tools.KT_CP(o_comb_ob, truth, X)]
+
+
+# one run of testinfo_errors_sr_CP over a partial preorder of size size
+# returns the number of errors of lexcel, CP-majority, and CP-majority corrected by lexcel and by ordinal Banzhaf
+def trial_errors_sr_CP(rule, N, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+	truth = tools.Preorder([[x[0]] for x in order])
+
+	res = get_sized_order(size, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res, X)
+	pref_CP = SR.CP_matrix(res, X)
+	o_comb_lex = tools.corrected_CP(pref_CP, o_lex, X)
+	o_ban = SR.ordinal_banzhaf(res,X)
+	o_comb_ob = tools.corrected_CP(pref_CP, o_ban, X)
+	return [tools.Kendall_Tau(o_lex, truth, X), tools.count_inverse(pref_CP, truth, X), tools.count_inverse(o_comb_lex, truth, X), tools.count_inverse(o_comb_ob, truth, X)]
+
+
+# one run of testinfo_all over a partial preorder of size size, computing each SR method only once
+# returns a dict giving for each measure (exact, win, KT, errors, KT_sr_CP, errors_sr_CP) the same results as its own trial function
+def trial_all(rule, N, size, rng=random) :
+	return trials_all(rule, N, size, [rng])[0]
+
+
+# runs of testinfo_all over partial preorders of size size, one per random generator in rngs, all sampled at once
+# returns the results of trial_all for each run (the same as running them one by one)
+def trials_all(rule, N, size, rngs) :
+	X = [i+1 for i in range(N)]
+	orders = []
+	keys = []
+	for rng in rngs :
+		order = [(x,) for x in X]
+		rng.shuffle(order)
+		orders.append(order)
+		# key of the removals of the trial (see get_removals)
+		keys.append(rng.getrandbits(64))
+	ranks = get_sized_ranks(size, orders, X, rule, keys)
+
+	# CP-majority and ordinal Banzhaf scores of all runs at once
+	W = SR.CP_matrices(ranks, N)
+	pro, neg = SR.banzhaf_counts(ranks, N)
+	o_lex = [SR.lexcel(get_preorder(ranks[t], X), X) for t in range(len(rngs))]
+	return get_measures(orders, X, o_lex, W, pro-neg)
+
+
+# given the orders over the population X of a batch of runs, the lexcel rankings recovered in each run, the dominance matrices of CP-majority (runs x N x N, see SR.CP_matrices) and the ordinal Banzhaf scores (runs x N)
+# returns the results of trial_all for each run
+def get_measures(orders, X, o_lex, W, score) :
+	N = len(X)
+	truth = [[[x[0]] for x in order] for order in orders]
+	o_CP = []
+	o_ban = []
+	o_comb_lex = []
+	o_comb_ob = []
+	for t in range(len(orders)) :
+		o_CP.append(tools.join_prefs_ind(W[t],N))
+		o_ban.append(tools.group_by_score(X, score[t]))
+		o_comb_lex.append(tools.corrected_CP(W[t], o_lex[t], X))
+		o_comb_ob.append(tools.corrected_CP(W[t], o_ban[t], X))
+
+	# distances to the ground truth of all runs at once
+	og = kendall.get_rank_matrix(truth, X)
+	KT_lex = kendall.distances(kendall.get_rank_matrix(o_lex, X), og).tolist()
+	KT_ban = kendall.distances(kendall.get_rank_matrix(o_ban, X), og).tolist()
+	KT_CP = kendall.CP_distances(W, og).tolist()
+	err_CP = kendall.CP_inversions(W, og).tolist()
+	W_lex = np.array(o_comb_lex)
+	W_ob = np.array(o_comb_ob)
+	KT_comb_lex = kendall.CP_distances(W_lex, og).tolist()
+	KT_comb_ob = kendall.CP_distances(W_ob, og).tolist()
+	err_comb_lex = kendall.CP_inversions(W_lex, og).tolist()
+	err_comb_ob = kendall.CP_inversions(W_ob, og).tolist()
+	return [{
+		"exact" : [int(o == truth[t]) for o in [o_lex[t], o_CP[t], o_ban[t]]],
+		"win" : [int(len(o[0]) == 1 and o[0][0] == orders[t][0][0]) for o in [o_lex[t], o_CP[t], o_ban[t]]],
+		"KT" : [KT_lex[t], KT_CP[t], KT_ban[t]],
+		"errors" : [KT_lex[t], err_CP[t], KT_ban[t]],
+		"KT_sr_CP" : [KT_lex[t], KT_CP[t], KT_comb_lex[t], KT_comb_ob[t]],
+		"errors_sr_CP" : [KT_lex[t], err_CP[t], err_comb_lex[t], err_comb_ob[t]],
+	} for t in range(len(orders))]
+
+
+# one run of testinfo_all over nested partial preorders of the given sizes (increasing): coalitions arrive in a random order, and the partial preorder of each size is made of the first ones
+# returns a dict giving for each size the results of trial_all over the partial preorder of this size
+def trial_nested(rule, N, sizes, rng=random) :
+	return trials_nested(rule, N, sizes, [rng])[0]
+
+
+# runs of trial_nested, one per random generator in rngs, all sampled at once
+# the partial preorder of each size is drawn as by trials_all (see get_arrival_steps), and the SR scores of all sizes are accumulated along the arrival of the coalitions instead of being computed again for each size
+def trials_nested(rule, N, sizes, rngs) :
+	X = [i+1 for i in range(N)]
+	orders = []
+	keys = []
+	for rng in rngs :
+		order = [(x,) for x in X]
+		rng.shuffle(order)
+		orders.append(order)
+		keys.append(rng.getrandbits(64))
+	eq, ring = get_removals(orders, X, rule, keys)
+	steps = get_arrival_steps(eq, ring, sizes, X, rule)
+
+	wins = SR.CP_tallies_nested(eq, steps, len(sizes), N)
+	pro, neg = SR.banzhaf_counts_nested(eq, steps, len(sizes), N)
+	o_lex = [SR.lexcel_nested(eq[t], steps[t], len(sizes), X) for t in range(len(rngs))]
+	res = [{} for _ in rngs]
+	for g in range(len(sizes)) :
+		runs = get_measures(orders, X, [o[g] for o in o_lex], SR.CP_dominance(wins[:, g]), pro[:, g]-neg[:, g])
+		for t in range(len(rngs)) :
+			res[t][sizes[g]] = runs[t]
+	return res
+
+
+# batch version of the trial functions which have one (given the arguments of the trial and the random generators of the runs, returns the results of the runs)
+batches = {
+	trial_all: trials_all,
+	trial_nested: trials_nested,
+}
+
+
+# one run of k_info_exact over size coalitions of size k
+# returns for lexcel, CP-majority and CP-majority corrected by lexcel whether the exact order is recovered (1) or not (0)
+def trial_k_exact(rule, N, k, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+	truth = tools.Preorder([[x[0]] for x in order])
+
+	res2 = get_k_sized_order(size, k, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res2, X)
+	pref_CP = SR.CP_matrix(res2, X)
+	o_CP = tools.join_prefs_ind(pref_CP,N)
+	# Hybrid CP + lexcel
+	pref_hybrid = tools.corrected_CP(pref_CP, o_lex, X)
+	o_comb_lex = tools.join_prefs_ind(pref_hybrid,N)
+	return [int(o_lex == truth), int(o_CP == truth), int(o_comb_lex == truth)]
+
+
+# one run of k_info_win over size coalitions of size k
+# returns for lexcel, CP-majority and CP-majority corrected by lexcel whether the top item is recovered as the UNIQUE winner (1) or not (0)
+def trial_k_win(rule, N, k, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+
+	res2 = get_k_sized_order(size, k, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res2, X)
+	pref_CP = SR.CP_matrix(res2, X)
+	o_CP = tools.join_prefs_ind(pref_CP,N)
+	pref_hybrid = tools.corrected_CP(pref_CP, o_lex, X)
+	o_comb_lex = tools.join_prefs_ind(pref_hybrid,N)
+	return [int(len(o[0]) == 1 and o[0][0] == order[0][0]) for o in [o_lex, o_CP, o_comb_lex]]
+
+
+# one run of k_info_KT over size coalitions of size k
+# returns the (weak) Kendall-Tau distances to the ground truth of lexcel, CP-majority and CP-majority corrected by lexcel
+def trial_k_KT(rule, N, k, size, rng=random) :
+	X = [i+1 for i in range(N)]
+	order = [(x,) for x in X]
+	rng.shuffle(order)
+	truth = tools.Preorder([[x[0]] for x in order])
+
+	res2 = get_k_sized_order(size, k, order, X, rule, rng)
+
+	o_lex = SR.lexcel(res2, X)
+	pref_CP = SR.CP_matrix(res2, X)
+	o_comb_lex = tools.corrected_CP(pref_CP, o_lex, X)
+	return [tools.Kendall_Tau(o_lex, truth, X), tools.KT_CP(pref_CP, truth, X), tools.KT_CP(o_comb_lex, truth, X)]
+
+
 # for partial info: tests which method returns exact initial preorder with only a percentage of coalitions available
-def testinfo_exact(rule, N, nb_runs) :
-	# sizes of preorders to test (will be computed as percentages of 2^N)
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
+# in exact mode, the expected numbers of runs recovering the order are computed over all partial preorders of each size (see get_exact_recovery), as long as there are not too many of them
+def testinfo_exact(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, plots=True, exact=False, tolerance=None) :
+	# sizes of preorders to test are computed as percentages tests of 2^N
 	print("Testing recovery of exact order with "+get_rule_name(rule))
 	X = [i+1 for i in range(N)]
+	stream = get_stream("exact", rule, N, block, seed)
+	# sampled cells (percentage, histograms)
+	cells = []
 	val = []
+	# number of runs of each cell
+	runs = []
 	size = 1
 	lab = []
 	for size_g in [(2**N)*i for i in tests] :
@@ -102,38 +981,298 @@ def testinfo_exact(rule, N, nb_runs) :
 			break
 		lab.append(size_g/(2**N))
 		size = math.ceil(size_g)
-		lex = 0
-		CP = 0
-		o_b = 0
-		for i in range(nb_runs) :
-			order = [(x,) for x in X]
-			random.shuffle(order)
-
-			res = get_sized_order(size, order, X, rule)
-
-			# LEXCEL
-			# returns list of equivalence classes to express ranking over elements
-			o_lex = SR.lexcel(res, X)
-			if o_lex == [[x[0]] for x in order] :
-				lex += 1
-
-			# CP-MAJORITY
-			# returns list of pairwise preferences (not necessarily transitive)
-			pref_CP = SR.CPmaj(res, X)
-			o_CP = tools.join_prefs_ind(pref_CP,N)
-			if o_CP == [[x[0]] for x in order] :
-				CP += 1
-
-			# ORDINAL BANZHAF
-			# returns list of equivalence classes to express ranking over elements
-			o_ban = SR.ordinal_banzhaf(res,X)
-			if o_ban == [[x[0]] for x in order] :
-				o_b += 1
+		p = get_exact_recovery(rule, N, size) if exact else None
+		if p is not None :
+			lex, CP, o_b = get_expected(nb_runs, p)
+			runs.append(nb_runs)
+		else :
+			hist = run_cell({"exact": stream}, trial_exact, (rule, N, size), nb_runs, pool, seed, tolerance)["exact"]
+			cells.append([size_g/(2**N), hist])
+			lex, CP, o_b = get_counts(hist, nb_runs)
+			runs.append(sum(hist[0].values()))
 		val.append([lex, CP, o_b])
 		# no need to continue if a given percentage of coalitions is sufficient for every method to recover the order correctly: a larger percentage will lead to the same result
 		if lex == CP == o_b == nb_runs :
 			break
 
+	save_exact(rule, N, nb_runs, lab, val, plots, runs if tolerance is not None else None)
+	if tolerance is not None :
+		save_precision("exact", rule, N, ['Percentage of total coalitions'], cells)
+
+
+# for partial info: tests which method returns exact winner with only a percentage of coalitions available
+def testinfo_win(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, plots=True, tolerance=None) :
+	# sizes of preorders to test are computed as percentages tests of 2^N
+	print("Testing recovery of top item with "+get_rule_name(rule))
+	X = [i+1 for i in range(N)]
+	stream = get_stream("win", rule, N, block, seed)
+	cells = []
+	val = []
+	# number of runs of each cell
+	runs = []
+	size = 1
+	lab = []
+	for size_g in [(2**N)*i for i in tests] :
+		if size_g <= size :
+			continue
+		if math.ceil(size_g) == 2**N :
+			break
+		lab.append(size_g/(2**N))
+		size = math.ceil(size_g)
+		hist = run_cell({"win": stream}, trial_win, (rule, N, size), nb_runs, pool, seed, tolerance)["win"]
+		cells.append([size_g/(2**N), hist])
+		lex, CP, o_b = get_counts(hist, nb_runs)
+		val.append([lex, CP, o_b])
+		runs.append(sum(hist[0].values()))
+		if lex == CP == o_b == nb_runs :
+			break
+
+	save_win(rule, N, nb_runs, lab, val, plots, runs if tolerance is not None else None)
+	if tolerance is not None :
+		save_precision("win", rule, N, ['Percentage of total coalitions'], cells)
+
+
+# for partial info: measures Kendall-Tau distance between initial preorder & that retrieved by each method with only a percentage of coalitions available
+def testinfo_KT(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, npy=False, plots=True, tolerance=None) :
+	# sizes of preorders to test are computed as percentages tests of 2^N
+	print("Measuring (weak) Kendall-Tau distance between recovered order and ground truth with "+get_rule_name(rule))
+	X = [i+1 for i in range(N)]
+	stream = get_stream("KT", rule, N, block, seed)
+	# key of each tested size in the stream
+	keys = []
+	val = []
+	size = 1
+	lab = []
+	for size_g in [(2**N)*i for i in tests] :
+		if size_g <= size :
+			continue
+		if math.ceil(size_g) == 2**N :
+			break
+		lab.append(size_g/(2**N))
+		size = math.ceil(size_g)
+		storage = run_cell({"KT": stream}, trial_KT, (rule, N, size), nb_runs, pool, seed, tolerance)["KT"]
+		keys.append((rule, N, size))
+
+		val.append([_ for _ in storage])
+		# if we reach the point from which we always get a KT distance of 0, we stop
+		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
+			break
+
+	save_KT(rule, N, nb_runs, lab, val, stream, keys, npy, plots)
+	if tolerance is not None :
+		save_precision("KT", rule, N, ['Percentage of total coalitions'], [[lab[i], val[i]] for i in range(len(lab))])
+
+
+# for partial info: measures nb of incorrect pairwise prefences between initial preorder & that retrieved by each method with only a percentage of coalitions available
+def testinfo_errors(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, npy=False, plots=True, tolerance=None) :
+	# sizes of preorders to test are computed as percentages tests of 2^N
+	print("Counting number of errors between recovered order and ground truth with "+get_rule_name(rule))
+	X = [i+1 for i in range(N)]
+	stream = get_stream("errors", rule, N, block, seed)
+	# key of each tested size in the stream
+	keys = []
+	val = []
+	size = 1
+	lab = []
+	for size_g in [(2**N)*i for i in tests] :
+		if size_g <= size :
+			continue
+		if math.ceil(size_g) == 2**N :
+			break
+		lab.append(size_g/(2**N))
+		size = math.ceil(size_g)
+		storage = run_cell({"errors": stream}, trial_errors, (rule, N, size), nb_runs, pool, seed, tolerance)["errors"]
+		keys.append((rule, N, size))
+
+		val.append([_ for _ in storage])
+		# if at this stage no method makes any error, then they will not make any with higher thresholds either: we can stop here
+		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
+			break
+
+	save_errors(rule, N, nb_runs, lab, val, stream, keys, npy, plots)
+	if tolerance is not None :
+		save_precision("errors", rule, N, ['Percentage of total coalitions'], [[lab[i], val[i]] for i in range(len(lab))])
+
+
+# for partial info: measures (weak) Kendall-Tau distance between prefs recovered by combinations of SR methods and the ground truth
+def testinfo_KT_sr_CP(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, npy=False, plots=True, tolerance=None) :
+	print("Measuring (weak) Kendall-Tau distance for combinations of SR methods with "+get_rule_name(rule))
+	X = [i+1 for i in range(N)]
+	stream = get_stream("KT_sr_CP", rule, N, block, seed)
+	# key of each tested size in the stream
+	keys = []
+	val = []
+	size = 1
+	lab = []
+	for size_g in [(2**N)*i for i in tests] :
+		if size_g <= size :
+			continue
+		if math.ceil(size_g) == 2**N :
+			break
+		lab.append(size_g/(2**N))
+		size = math.ceil(size_g)
+		storage = run_cell({"KT_sr_CP": stream}, trial_KT_sr_CP, (rule, N, size), nb_runs, pool, seed, tolerance)["KT_sr_CP"]
+		keys.append((rule, N, size))
+
+		val.append([_ for _ in storage])
+		# If all methods get a Kendall-Tau distance of 0, no need to explore further
+		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
+			break
+
+	save_KT_sr_CP(rule, N, nb_runs, lab, val, stream, keys, npy, plots)
+	if tolerance is not None :
+		save_precision("KT_sr_CP", rule, N, ['Percentage of total coalitions'], [[lab[i], val[i]] for i in range(len(lab))])
+
+
+# for partial info: measures nb of incorrect pairwise preferences between initial preorder & that retrieved by each combination of CP with another SR method, with only a certain percentage of coalitions available
+def testinfo_errors_sr_CP(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, npy=False, plots=True, tolerance=None) :
+	print("Counting number of errors for combinations of methods with rule "+get_rule_name(rule))
+	X = [i+1 for i in range(N)]
+	stream = get_stream("errors_sr_CP", rule, N, block, seed)
+	# key of each tested size in the stream
+	keys = []
+	val = []
+	size = 1
+	lab = []
+	for size_g in [(2**N)*i for i in tests] :
+		if size_g <= size :
+			continue
+		if math.ceil(size_g) == 2**N :
+			break
+		lab.append(size_g/(2**N))
+		size = math.ceil(size_g)
+		storage = run_cell({"errors_sr_CP": stream}, trial_errors_sr_CP, (rule, N, size), nb_runs, pool, seed, tolerance)["errors_sr_CP"]
+		keys.append((rule, N, size))
+
+		val.append([_ for _ in storage])
+		# if no method makes any error at this point, we can stop
+		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
+			break
+
+	save_errors_sr_CP(rule, N, nb_runs, lab, val, stream, keys, npy, plots)
+	if tolerance is not None :
+		save_precision("errors_sr_CP", rule, N, ['Percentage of total coalitions'], [[lab[i], val[i]] for i in range(len(lab))])
+
+
+# given the population size N and the tested percentages
+# returns the (percentage of 2^N, size) of the partial preorders tested by testinfo_all, before any measure stops
+def get_sizes(N, tests) :
+	sizes = []
+	size = 1
+	for size_g in [(2**N)*i for i in tests] :
+		if size_g <= size :
+			continue
+		if math.ceil(size_g) == 2**N :
+			break
+		size = math.ceil(size_g)
+		sizes.append((size_g, size))
+	return sizes
+
+
+# for partial info: runs the measures of testinfo_exact, testinfo_win, testinfo_KT, testinfo_errors, testinfo_KT_sr_CP and testinfo_errors_sr_CP on the same runs
+# each partial preorder is sampled once and each SR method ran once for all measures, and every measure stops where its own function would
+# in exact mode, the recovery of the exact order is computed as by testinfo_exact instead
+# in nested mode, each run draws nested partial preorders of all the tested sizes at once (see run_sweep): every size is ran, the measures stopping as they would in their outputs only
+def testinfo_all(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, npy=False, plots=True, exact=False, tolerance=None, nested=False) :
+	# sizes of preorders to test are computed as percentages tests of 2^N
+	print("Running all measures over shared runs with "+get_rule_name(rule))
+	streams = {m: get_stream(m, rule, N, block, seed, nested) for m in ["exact", "win", "KT", "errors", "KT_sr_CP", "errors_sr_CP"]}
+	if nested :
+		swept = run_sweep(streams, rule, N, [size for size_g, size in get_sizes(N, tests)], nb_runs, pool, seed, tolerance)
+	lab = {m: [] for m in streams}
+	val = {m: [] for m in streams}
+	keys = {m: [] for m in streams}
+	# number of runs of each cell
+	runs = {m: [] for m in streams}
+	# sampled cells (percentage, histograms)
+	cells = {m: [] for m in streams}
+	running = [m for m in streams]
+	for size_g, size in get_sizes(N, tests) :
+		# testinfo_exact does not go up to the complete information case
+		if size >= 2**N-2 and "exact" in running :
+			running.remove("exact")
+		if not running :
+			break
+		p = get_exact_recovery(rule, N, size) if exact and "exact" in running else None
+		sampled = [m for m in running if m != "exact" or p is None]
+		storage = {}
+		if sampled and nested :
+			storage = {m: swept[size][m] for m in sampled}
+		elif sampled :
+			storage = run_cell({m: streams[m] for m in sampled}, trial_all, (rule, N, size), nb_runs, pool, seed, tolerance)
+
+		for m in [m for m in running] :
+			lab[m].append(size_g/(2**N))
+			keys[m].append((rule, N, size))
+			if m in storage :
+				cells[m].append([size_g/(2**N), storage[m]])
+				runs[m].append(sum(storage[m][0].values()))
+			else :
+				runs[m].append(nb_runs)
+			if m == "exact" and p is not None :
+				val[m].append(get_expected(nb_runs, p))
+				if min(val[m][-1]) == nb_runs :
+					running.remove(m)
+			elif m in ["exact", "win"] :
+				val[m].append(get_counts(storage[m], nb_runs))
+				# every method recovers the order in every run
+				if min(val[m][-1]) == nb_runs :
+					running.remove(m)
+			else :
+				val[m].append(storage[m])
+				# the (combinations of) methods always get a distance of 0
+				if max(storage[m][0]) == max(storage[m][1]) == max(storage[m][2]) == 0 :
+					running.remove(m)
+
+	save_exact(rule, N, nb_runs, lab["exact"], val["exact"], plots, runs["exact"] if tolerance is not None else None)
+	save_win(rule, N, nb_runs, lab["win"], val["win"], plots, runs["win"] if tolerance is not None else None)
+	save_KT(rule, N, nb_runs, lab["KT"], val["KT"], streams["KT"], keys["KT"], npy, plots)
+	save_errors(rule, N, nb_runs, lab["errors"], val["errors"], streams["errors"], keys["errors"], npy, plots)
+	save_KT_sr_CP(rule, N, nb_runs, lab["KT_sr_CP"], val["KT_sr_CP"], streams["KT_sr_CP"], keys["KT_sr_CP"], npy, plots)
+	save_errors_sr_CP(rule, N, nb_runs, lab["errors_sr_CP"], val["errors_sr_CP"], streams["errors_sr_CP"], keys["errors_sr_CP"], npy, plots)
+	if tolerance is not None :
+		for m in streams :
+			save_precision(m, rule, N, ['Percentage of total coalitions'], cells[m])
+
+
+# given the rules, the population sizes Ns, the number of runs, the shard number and the number of shards
+# runs the shard-th of the cells (rule, N, size) of testinfo_all (taken in turn by the nb_shards shards) and streams their results, without saving any output
+# cells are ran for every measure, as stopping a measure depends on the results of the other shards: once shards are merged (see merge), testinfo_all finds all its runs in the streams
+# in nested mode, the cells are the sweeps (rule, N) of run_sweep
+def run_shard(rules, Ns, nb_runs, shard, nb_shards, pool=None, seed=None, block=1000, tests=default_tests, tolerance=None, nested=False) :
+	cell = 0
+	for N in Ns :
+		for rule in rules :
+			streams = {m: get_stream(m, rule, N, block, seed, nested) for m in ["exact", "win", "KT", "errors", "KT_sr_CP", "errors_sr_CP"]}
+			if nested :
+				if cell % nb_shards == shard :
+					print("Running shard "+str(shard)+" of "+str(nb_shards)+": N = "+str(N)+", "+get_rule_name(rule)+", all sizes")
+					run_sweep(streams, rule, N, [size for size_g, size in get_sizes(N, tests)], nb_runs, pool, seed, tolerance)
+				cell += 1
+				continue
+			for size_g, size in get_sizes(N, tests) :
+				if cell % nb_shards == shard :
+					print("Running shard "+str(shard)+" of "+str(nb_shards)+": N = "+str(N)+", "+get_rule_name(rule)+", size "+str(size))
+					run_cell({m: streams[m] for m in streams if m != "exact" or size < 2**N-2}, trial_all, (rule, N, size), nb_runs, pool, seed, tolerance)
+				cell += 1
+
+
+# given the folders in which shards were ran
+# merges the streams of their results into the streams of the current folder
+def merge(folders) :
+	for folder in folders :
+		for root, dirs, files in os.walk(os.path.join(folder, 'out', 'data')) :
+			for file in files :
+				if file.endswith(".manifest") :
+					src = os.path.join(root, file[:-len(".manifest")])
+					print("Merging "+src)
+					results.merge_stream(src, os.path.relpath(src, folder))
+
+
+# given the rule, the population size N, the number of runs, the tested percentages lab, the results val of testinfo_exact and the number of runs of each percentage (None if they all have nb_runs, i.e. without tolerance)
+# plots the recovery counts of the exact order
+def plot_exact(rule, N, nb_runs, lab, val, runs=None) :
+	plt = get_pyplot()
 	fig, ax = plt.subplots()
 	b = np.arange(len(lab))
 	b1 = [x+0.15 for x in b]
@@ -147,7 +1286,7 @@ def testinfo_exact(rule, N, nb_runs) :
 	plt.xlabel("Percentage of total coalitions present in the preorder")
 	plt.xticks([i+0.2 for i in range(len(lab))], labels=[int(i*100) for i in lab])
 	plt.suptitle("Nb of runs for which the correct order is recovered from partial preferences")
-	plt.title( "(N = "+str(N)+", "+str(nb_runs)+" runs, rule = "+get_rule_name(rule)+")")
+	plt.title( "(N = "+str(N)+", "+get_runs_label(nb_runs, runs)+", rule = "+get_rule_name(rule)+")")
 	plt.legend()
 	if not os.path.exists('out') :
 		os.mkdir('out')
@@ -155,67 +1294,37 @@ def testinfo_exact(rule, N, nb_runs) :
 		os.mkdir('out/plots')
 	if not os.path.exists('out/plots/exact') :
 		os.mkdir('out/plots/exact')
+	plt.savefig("out/plots/exact/N"+str(N)+"_"+get_rule_name(rule)+".png", dpi=200)
+	plt.close(fig)
+
+
+# given the rule, the population size N, the number of runs, the tested percentages lab, the results val of testinfo_exact and the number of runs of each percentage (None if they all have nb_runs, i.e. without tolerance)
+# saves the recovery counts of the exact order and, unless plots is False, plots them
+def save_exact(rule, N, nb_runs, lab, val, plots=True, runs=None) :
+	if not os.path.exists('out') :
+		os.mkdir('out')
 	if not os.path.exists('out/data') :
 		os.mkdir('out/data')
 	if not os.path.exists('out/data/exact') :
 		os.mkdir('out/data/exact')
-	plt.savefig("out/plots/exact/N"+str(N)+"_"+get_rule_name(rule)+".png", dpi=200)
-	plt.close(fig)
-
 	with open('out/data/exact/N'+str(N)+'_'+get_rule_name(rule)+'.csv', 'w') as f:
 		pen = csv.writer(f, delimiter=';')
-		pen.writerow(['Percentage of total coalitions', 'Correct results [Lexcel, CP-maj, Banzhaf]'])
-		pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
+		# the runs of each percentage are only given if some may have been stopped early (see run_cell)
+		if runs is None :
+			pen.writerow(['Percentage of total coalitions', 'Correct results [Lexcel, CP-maj, Banzhaf]'])
+			pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
+		else :
+			pen.writerow(['Percentage of total coalitions', 'Correct results [Lexcel, CP-maj, Banzhaf]', 'Runs (results are scaled to '+str(nb_runs)+' runs if fewer)'])
+			pen.writerows([[lab[i],val[i],runs[i]] for i in range(len(lab))])
 
+	if plots :
+		plot_exact(rule, N, nb_runs, lab, val, runs)
 
-# for partial info: tests which method returns exact winner with only a percentage of coalitions available
-def testinfo_win(rule, N, nb_runs) :
-	# sizes of preorders to test (will be computed as percentages of 2^N)
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
-	print("Testing recovery of top item with "+get_rule_name(rule))
-	X = [i+1 for i in range(N)]
-	val = []
-	size = 1
-	lab = []
-	for size_g in [(2**N)*i for i in tests] :
-		if size_g <= size :
-			continue
-		if math.ceil(size_g) == 2**N :
-			break
-		lab.append(size_g/(2**N))
-		size = math.ceil(size_g)
-		lex = 0
-		CP = 0
-		o_b = 0
-		for i in range(nb_runs) :
-			order = [(x,) for x in X]
-			random.shuffle(order)
-			
-			res = get_sized_order(size, order, X, rule)
-
-			# LEXCEL
-			# returns list of equivalence classes to express ranking over elements
-			o_lex = SR.lexcel(res, X)
-			if len(o_lex[0]) == 1 and o_lex[0][0] == order[0][0] :
-				lex += 1
-
-			# CP-MAJORITY
-			# returns list of pairwise preferences (not necessarily transitive)
-			pref_CP = SR.CPmaj(res, X)
-			o_CP = tools.join_prefs_ind(pref_CP,N)
-			if len(o_CP[0]) == 1 and o_CP[0][0] == order[0][0] :
-				CP += 1
-
-			# ORDINAL BANZHAF
-			# returns list of equivalence classes to express ranking over elements
-			o_ban = SR.ordinal_banzhaf(res,X)
-			if len(o_ban[0]) == 1 and o_ban[0][0] == order[0][0] :
-				o_b += 1
-		val.append([lex, CP, o_b])
-		if lex == CP == o_b == nb_runs :
-			break
 
+# given the rule, the population size N, the number of runs, the tested percentages lab, the results val of testinfo_win and the number of runs of each percentage (None if they all have nb_runs, i.e. without tolerance)
+# plots the recovery counts of the top item
+def plot_win(rule, N, nb_runs, lab, val, runs=None) :
+	plt = get_pyplot()
 	fig, ax = plt.subplots()
 	b = np.arange(len(lab))
 	b1 = [x+0.15 for x in b]
@@ -229,7 +1338,7 @@ def testinfo_win(rule, N, nb_runs) :
 	plt.xlabel("Percentage of total coalitions present in the preorder")
 	plt.xticks([i+0.2 for i in range(len(lab))], labels=[int(i*100) for i in lab])
 	plt.suptitle("Nb of runs for which the correct top item is recovered from partial preferences")
-	plt.title( "(N = "+str(N)+", "+str(nb_runs)+" runs, rule = "+get_rule_name(rule)+")")
+	plt.title( "(N = "+str(N)+", "+get_runs_label(nb_runs, runs)+", rule = "+get_rule_name(rule)+")")
 	plt.legend()
 	if not os.path.exists('out') :
 		os.mkdir('out')
@@ -237,70 +1346,41 @@ def testinfo_win(rule, N, nb_runs) :
 		os.mkdir('out/plots')
 	if not os.path.exists('out/plots/win') :
 		os.mkdir('out/plots/win')
+	plt.savefig("out/plots/win/N"+str(N)+"_"+get_rule_name(rule)+"_win.png", dpi=200)
+	plt.close(fig)
+
+
+# given the rule, the population size N, the number of runs, the tested percentages lab, the results val of testinfo_win and the number of runs of each percentage (None if they all have nb_runs, i.e. without tolerance)
+# saves the recovery counts of the top item and, unless plots is False, plots them
+def save_win(rule, N, nb_runs, lab, val, plots=True, runs=None) :
+	if not os.path.exists('out') :
+		os.mkdir('out')
 	if not os.path.exists('out/data') :
 		os.mkdir('out/data')
 	if not os.path.exists('out/data/win') :
 		os.mkdir('out/data/win')
-	plt.savefig("out/plots/win/N"+str(N)+"_"+get_rule_name(rule)+"_win.png", dpi=200)
-	plt.close(fig)
-
 	with open('out/data/win/N'+str(N)+'_'+get_rule_name(rule)+'_win.csv', 'w') as f:
 		pen = csv.writer(f, delimiter=';')
-		pen.writerow(['Percentage of total coalitions', 'Correct results [Lexcel, CP-maj, Banzhaf]'])
-		pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
-
+		# the runs of each percentage are only given if some may have been stopped early (see run_cell)
+		if runs is None :
+			pen.writerow(['Percentage of total coalitions', 'Correct results [Lexcel, CP-maj, Banzhaf]'])
+			pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
+		else :
+			pen.writerow(['Percentage of total coalitions', 'Correct results [Lexcel, CP-maj, Banzhaf]', 'Runs (results are scaled to '+str(nb_runs)+' runs if fewer)'])
+			pen.writerows([[lab[i],val[i],runs[i]] for i in range(len(lab))])
 
-# for partial info: measures Kendall-Tau distance between initial preorder & that retrieved by each method with only a percentage of coalitions available
-def testinfo_KT(rule, N, nb_runs) :
-	# sizes of preorders to test (will be computed as percentages of 2^N)
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
-	print("Measuring (weak) Kendall-Tau distance between recovered order and ground truth with "+get_rule_name(rule))
-	X = [i+1 for i in range(N)]
-	val = []
-	size = 1
-	lab = []
-	for size_g in [(2**N)*i for i in tests] :
-		if size_g <= size :
-			continue
-		if math.ceil(size_g) == 2**N :
-			break
-		lab.append(size_g/(2**N))
-		size = math.ceil(size_g)
-		lex = 0
-		CP = 0
-		o_b = 0
-		storage = [[],[],[]]
-		for i in range(nb_runs) :
-			order = [(x,) for x in X]
-			random.shuffle(order)
-			
-			res = get_sized_order(size, order, X, rule)
-
-			# LEXCEL
-			# returns list of equivalence classes to express ranking over elements
-			o_lex = SR.lexcel(res, X)
-			storage[0].append(tools.Kendall_Tau(o_lex, [[x[0]] for x in order], X))
-
-			# CP-MAJORITY
-			# returns list of pairwise preferences (not necessarily transitive)
-			pref_CP = SR.CPmaj(res, X)
-			storage[1].append(tools.KT_CP(pref_CP, [[x[0]] for x in order]))
-
-			# ORDINAL BANZHAF
-			# returns list of equivalence classes to express ranking over elements
-			o_ban = SR.ordinal_banzhaf(res,X)
-			storage[2].append(tools.Kendall_Tau(o_ban, [[x[0]] for x in order], X))
+	if plots :
+		plot_win(rule, N, nb_runs, lab, val, runs)
 
-		val.append([_ for _ in storage])
-		# if we reach the point from which we always get a KT distance of 0, we stop
-		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
-			break
 
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_KT and the number of runs of each percentage (None if they all have nb_runs)
+# plots the (weak) Kendall-Tau distances
+def plot_KT(rule, N, nb_runs, lab, val, runs=None) :
+	plt = get_pyplot()
 	fig, ax = plt.subplots()
-	bp1 = ax.boxplot([val[i][0] for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
-	bp2 = ax.boxplot([val[i][1] for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
-	bp3 = ax.boxplot([val[i][2] for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
+	bp1 = ax.bxp([results.get_box_stats(val[i][0]) for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
+	bp2 = ax.bxp([results.get_box_stats(val[i][1]) for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
+	bp3 = ax.bxp([results.get_box_stats(val[i][2]) for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
 	for median in bp1['medians']:
 		median.set_color("C1")
 	for median in bp2['medians']:
@@ -313,7 +1393,7 @@ def testinfo_KT(rule, N, nb_runs) :
 	plt.xlabel("Percentage of total coalitions present in the preorder")
 	plt.xticks([2.2*i+0.4 for i in range(len(lab))], labels=[int(i*100) for i in lab])
 	plt.suptitle("(Weak) Kendall-Tau distance between recovered order and ground truth")
-	plt.title( "(N = "+str(N)+", "+str(nb_runs)+" runs, rule = "+get_rule_name(rule)+")")
+	plt.title( "(N = "+str(N)+", "+get_runs_label(nb_runs, runs, False)+", rule = "+get_rule_name(rule)+")")
 	plt.legend()
 	if not os.path.exists('out') :
 		os.mkdir('out')
@@ -321,72 +1401,40 @@ def testinfo_KT(rule, N, nb_runs) :
 		os.mkdir('out/plots')
 	if not os.path.exists('out/plots/KT') :
 		os.mkdir('out/plots/KT')
+	plt.savefig("out/plots/KT/N"+str(N)+"_"+get_rule_name(rule)+"_KT.png", dpi=200)
+	plt.close(fig)
+
+
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_KT, their stream and their keys in it
+# saves the (weak) Kendall-Tau distances (with npy, also as .npy files, see results.save_columns) and, unless plots is False, plots them
+def save_KT(rule, N, nb_runs, lab, val, stream, keys, npy=False, plots=True) :
+	if not os.path.exists('out') :
+		os.mkdir('out')
 	if not os.path.exists('out/data') :
 		os.mkdir('out/data')
 	if not os.path.exists('out/data/KT') :
 		os.mkdir('out/data/KT')
-	
-	plt.savefig("out/plots/KT/N"+str(N)+"_"+get_rule_name(rule)+"_KT.png", dpi=200)
-	plt.close(fig)
-
 	with open('out/data/KT/N'+str(N)+'_'+get_rule_name(rule)+'_KT.csv', 'w') as f:
 		pen = csv.writer(f, delimiter=';')
 		pen.writerow(['Percentage of total coalitions', 'Results [Lexcel, CP-maj, Banzhaf]'])
-		pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
+		for i in range(len(lab)) :
+			results.write_columns(f, lab[i], stream, keys[i], sum(val[i][0].values()))
 
+	if npy :
+		results.save_columns('out/data/KT/npy', get_file_name("KT", rule, N), ["Lexcel", "CP-maj", "Banzhaf"], lab, stream, keys, val, nb_runs)
 
-# for partial info: measures nb of incorrect pairwise prefences between initial preorder & that retrieved by each method with only a percentage of coalitions available
-def testinfo_errors(rule, N, nb_runs) :
-	# sizes of preorders to test (will be computed as percentages of 2^N)
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
-	print("Counting number of errors between recovered order and ground truth with "+get_rule_name(rule))
-	X = [i+1 for i in range(N)]
-	val = []
-	size = 1
-	lab = []
-	for size_g in [(2**N)*i for i in tests] :
-		if size_g <= size :
-			continue
-		if math.ceil(size_g) == 2**N :
-			break
-		lab.append(size_g/(2**N))
-		size = math.ceil(size_g)
-		lex = 0
-		CP = 0
-		o_b = 0
-		storage = [[],[],[]]
-		for i in range(nb_runs) :
-			order = [(x,) for x in X]
-			random.shuffle(order)
-			
-			res = get_sized_order(size, order, X, rule)
-
-			# LEXCEL
-			# returns list of equivalence classes to express ranking over elements
-			o_lex = SR.lexcel(res, X)
-			storage[0].append(tools.Kendall_Tau(o_lex, [[x[0]] for x in order], X))
-
-			# CP-MAJORITY
-			# returns list of pairwise preferences (not necessarily transitive)
-			pref_CP = SR.CPmaj(res, X)
-			storage[1].append(tools.count_inverse(pref_CP, [[x[0]] for x in order]))
-
-			# ORDINAL BANZHAF
-			# returns list of equivalence classes to express ranking over elements
-			o_ban = SR.ordinal_banzhaf(res,X)
-			storage[2].append(tools.Kendall_Tau(o_ban, [[x[0]] for x in order], X))
-
-		val.append([_ for _ in storage])
-		# if at this stage no method makes any error, then they will not make any with higher thresholds either: we can stop here
-		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
-			break
+	if plots :
+		plot_KT(rule, N, nb_runs, lab, val, [sum(v[0].values()) for v in val])
 
 
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_errors and the number of runs of each percentage (None if they all have nb_runs)
+# plots the numbers of errors
+def plot_errors(rule, N, nb_runs, lab, val, runs=None) :
+	plt = get_pyplot()
 	fig, ax = plt.subplots()
-	bp1 = ax.boxplot([val[i][0] for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
-	bp2 = ax.boxplot([val[i][1] for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
-	bp3 = ax.boxplot([val[i][2] for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
+	bp1 = ax.bxp([results.get_box_stats(val[i][0]) for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
+	bp2 = ax.bxp([results.get_box_stats(val[i][1]) for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
+	bp3 = ax.bxp([results.get_box_stats(val[i][2]) for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
 	for median in bp1['medians']:
 		median.set_color("C1")
 	for median in bp2['medians']:
@@ -399,7 +1447,7 @@ def testinfo_errors(rule, N, nb_runs) :
 	plt.xlabel("Percentage of total coalitions present in the preorder")
 	plt.xticks([2.2*i+0.4 for i in range(len(lab))], labels=[int(i*100) for i in lab])
 	plt.suptitle("Nb of errors between recovered order and ground truth")
-	plt.title( "(N = "+str(N)+", "+str(nb_runs)+" runs, rule = "+get_rule_name(rule)+")")
+	plt.title( "(N = "+str(N)+", "+get_runs_label(nb_runs, runs, False)+", rule = "+get_rule_name(rule)+")")
 	# plt.legend()
 	if not os.path.exists('out') :
 		os.mkdir('out')
@@ -407,75 +1455,41 @@ def testinfo_errors(rule, N, nb_runs) :
 		os.mkdir('out/plots')
 	if not os.path.exists('out/plots/errors') :
 		os.mkdir('out/plots/errors')
+	plt.savefig("out/plots/errors/N"+str(N)+"_"+get_rule_name(rule)+"_errors.png", dpi=200)
+	plt.close(fig)
+
+
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_errors, their stream and their keys in it
+# saves the numbers of errors (with npy, also as .npy files, see results.save_columns) and, unless plots is False, plots them
+def save_errors(rule, N, nb_runs, lab, val, stream, keys, npy=False, plots=True) :
+	if not os.path.exists('out') :
+		os.mkdir('out')
 	if not os.path.exists('out/data') :
 		os.mkdir('out/data')
 	if not os.path.exists('out/data/errors') :
 		os.mkdir('out/data/errors')
-		
-	plt.savefig("out/plots/errors/N"+str(N)+"_"+get_rule_name(rule)+"_errors.png", dpi=200)
-	plt.close(fig)
-
 	with open('out/data/errors/N'+str(N)+'_'+get_rule_name(rule)+'_errors.csv', 'w') as f:
 		pen = csv.writer(f, delimiter=';')
 		pen.writerow(['Percentage of total coalitions', 'Nb of errors [Lexcel, CP-maj, Banzhaf]'])
-		pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
+		for i in range(len(lab)) :
+			results.write_columns(f, lab[i], stream, keys[i], sum(val[i][0].values()))
 
+	if npy :
+		results.save_columns('out/data/errors/npy', get_file_name("errors", rule, N), ["Lexcel", "CP-maj", "Banzhaf"], lab, stream, keys, val, nb_runs)
 
-# for partial info: measures (weak) Kendall-Tau distance between prefs recovered by combinations of SR methods and the ground truth
-def testinfo_KT_sr_CP(rule, N, nb_runs) :
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
-	print("Measuring (weak) Kendall-Tau distance for combinations of SR methods with "+get_rule_name(rule))
-	X = [i+1 for i in range(N)]
-	val = []
-	size = 1
-	lab = []
-	for size_g in [(2**N)*i for i in tests] :
-		if size_g <= size :
-			continue
-		if math.ceil(size_g) == 2**N :
-			break
-		lab.append(size_g/(2**N))
-		size = math.ceil(size_g)
-		lex = 0
-		CP = 0
-		o_b = 0
-		storage = [[],[],[],[]]
-		for i in range(nb_runs) :
-			order = [(x,) for x in X]
-			random.shuffle(order)
-			
-			res = get_sized_order(size, order, X, rule)
-
-			# LEXCEL
-			# returns list of equivalence classes to express ranking over elements
-			o_lex = SR.lexcel(res, X)
-			storage[0].append(tools.Kendall_Tau(o_lex, [[x[0]] for x in order], X))
-
-			# CP-MAJORITY
-			# returns list of pairwise preferences (not necessarily transitive)
-			pref_CP = SR.CPmaj(res, X)
-			storage[1].append(tools.KT_CP(pref_CP, [[x[0]] for x in order]))
-
-			# LEXCEL CORRECTED WITH CP
-			o_comb_lex = tools.corrected_CP(pref_CP, o_lex)
-			storage[2].append(tools.KT_CP(o_comb_lex, [[x[0]] for x in order]))
-
-			# ORDINAL BANZHAF CORRECTED WITH CP
-			o_ban = SR.ordinal_banzhaf(res,X)
-			o_comb_ob = tools.corrected_CP(pref_CP, o_ban)
-			storage[3].append(tools.KT_CP(o_comb_ob, [[x[0]] for x in order]))
+	if plots :
+		plot_errors(rule, N, nb_runs, lab, val, [sum(v[0].values()) for v in val])
 
-		val.append([_ for _ in storage])
-		# If all methods get a Kendall-Tau distance of 0, no need to explore further
-		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
-			break
 
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_KT_sr_CP and the number of runs of each percentage (None if they all have nb_runs)
+# plots the (weak) Kendall-Tau distances of the combinations of SR methods
+def plot_KT_sr_CP(rule, N, nb_runs, lab, val, runs=None) :
+	plt = get_pyplot()
 	fig, ax = plt.subplots()
-	bp1 = ax.boxplot([val[i][0] for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
-	bp2 = ax.boxplot([val[i][1] for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
-	bp3 = ax.boxplot([val[i][2] for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
-	bp4 = ax.boxplot([val[i][3] for i in range(len(lab))],positions=[2.2*i+1.2 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C4"), showfliers=False)
+	bp1 = ax.bxp([results.get_box_stats(val[i][0]) for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
+	bp2 = ax.bxp([results.get_box_stats(val[i][1]) for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
+	bp3 = ax.bxp([results.get_box_stats(val[i][2]) for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
+	bp4 = ax.bxp([results.get_box_stats(val[i][3]) for i in range(len(lab))],positions=[2.2*i+1.2 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C4"), showfliers=False)
 	for median in bp1['medians']:
 		median.set_color("C1")
 	for median in bp2['medians']:
@@ -490,7 +1504,7 @@ def testinfo_KT_sr_CP(rule, N, nb_runs) :
 	plt.xlabel("Percentage of total coalitions present in the preorder")
 	plt.xticks([2.2*i+0.6 for i in range(len(lab))], labels=[int(i*100) for i in lab])
 	plt.suptitle("(Weak) Kendall-Tau distance between recovered order and ground truth")
-	plt.title( "(N = "+str(N)+", "+str(nb_runs)+" runs, rule = "+get_rule_name(rule)+")")
+	plt.title( "(N = "+str(N)+", "+get_runs_label(nb_runs, runs, False)+", rule = "+get_rule_name(rule)+")")
 	# plt.legend()
 	if not os.path.exists('out') :
 		os.mkdir('out')
@@ -498,75 +1512,41 @@ def testinfo_KT_sr_CP(rule, N, nb_runs) :
 		os.mkdir('out/plots')
 	if not os.path.exists('out/plots/comb') :
 		os.mkdir('out/plots/comb')
+	plt.savefig("out/plots/comb/N"+str(N)+"_"+get_rule_name(rule)+"_comb_KT.png", dpi=200)
+	plt.close(fig)
+
+
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_KT_sr_CP, their stream and their keys in it
+# saves the (weak) Kendall-Tau distances of the combinations of SR methods (with npy, also as .npy files, see results.save_columns) and, unless plots is False, plots them
+def save_KT_sr_CP(rule, N, nb_runs, lab, val, stream, keys, npy=False, plots=True) :
+	if not os.path.exists('out') :
+		os.mkdir('out')
 	if not os.path.exists('out/data') :
 		os.mkdir('out/data')
 	if not os.path.exists('out/data/comb') :
 		os.mkdir('out/data/comb')
-		
-	plt.savefig("out/plots/comb/N"+str(N)+"_"+get_rule_name(rule)+"_comb_KT.png", dpi=200)
-	plt.close(fig)
-
 	with open('out/data/comb/N'+str(N)+'_'+get_rule_name(rule)+'_comb_KT.csv', 'w') as f:
 		pen = csv.writer(f, delimiter=';')
 		pen.writerow(['Percentage of total coalitions', 'Results [Lexcel, CP-maj, Banzhaf]'])
-		pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
+		for i in range(len(lab)) :
+			results.write_columns(f, lab[i], stream, keys[i], sum(val[i][0].values()))
 
+	if npy :
+		results.save_columns('out/data/comb/npy', get_file_name("KT_sr_CP", rule, N), ["Lexcel", "CP-maj", "CP+lex", "CP+Banzhaf"], lab, stream, keys, val, nb_runs)
 
-# for partial info: measures nb of incorrect pairwise preferences between initial preorder & that retrieved by each combination of CP with another SR method, with only a certain percentage of coalitions available
-def testinfo_errors_sr_CP(rule, N, nb_runs) :
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
-	print("Counting number of errors for combinations of methods with rule "+get_rule_name(rule))
-	X = [i+1 for i in range(N)]
-	val = []
-	size = 1
-	lab = []
-	for size_g in [(2**N)*i for i in tests] :
-		if size_g <= size :
-			continue
-		if math.ceil(size_g) == 2**N :
-			break
-		lab.append(size_g/(2**N))
-		size = math.ceil(size_g)
-		lex = 0
-		CP = 0
-		o_b = 0
-		storage = [[],[],[],[]]
-		for i in range(nb_runs) :
-			order = [(x,) for x in X]
-			random.shuffle(order)
-		
-			res = get_sized_order(size, order, X, rule)
-
-			# LEXCEL
-			# returns list of equivalence classes to express ranking over elements
-			o_lex = SR.lexcel(res, X)
-			storage[0].append(tools.Kendall_Tau(o_lex, [[x[0]] for x in order], X))
-
-			# CP-MAJORITY
-			# returns list of pairwise preferences (not necessarily transitive)
-			pref_CP = SR.CPmaj(res, X)
-			storage[1].append(tools.count_inverse(pref_CP, [[x[0]] for x in order]))
-
-			# LEXCEL CORRECTED WITH CP
-			o_comb_lex = tools.corrected_CP(pref_CP, o_lex)
-			storage[2].append(tools.count_inverse(o_comb_lex, [[x[0]] for x in order]))
-
-			# ORDINAL BANZHAF CORRECTED WITH CP
-			o_ban = SR.ordinal_banzhaf(res,X)
-			o_comb_ob = tools.corrected_CP(pref_CP, o_ban)
-			storage[3].append(tools.count_inverse(o_comb_ob, [[x[0]] for x in order]))
+	if plots :
+		plot_KT_sr_CP(rule, N, nb_runs, lab, val, [sum(v[0].values()) for v in val])
 
-		val.append([_ for _ in storage])
-		# if no method makes any error at this point, we can stop
-		if max(storage[0]) == max(storage[1]) == max(storage[2]) == 0 :
-			break
 
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_errors_sr_CP and the number of runs of each percentage (None if they all have nb_runs)
+# plots the numbers of errors of the combinations of SR methods
+def plot_errors_sr_CP(rule, N, nb_runs, lab, val, runs=None) :
+	plt = get_pyplot()
 	fig, ax = plt.subplots()
-	bp1 = ax.boxplot([val[i][0] for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
-	bp2 = ax.boxplot([val[i][1] for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
-	bp3 = ax.boxplot([val[i][2] for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
-	bp4 = ax.boxplot([val[i][3] for i in range(len(lab))],positions=[2.2*i+1.2 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C4"), showfliers=False)
+	bp1 = ax.bxp([results.get_box_stats(val[i][0]) for i in range(len(lab))],positions=[2.2*i for i in range(len(lab))], widths=0.3, boxprops=dict(color="C1"), showfliers=False)
+	bp2 = ax.bxp([results.get_box_stats(val[i][1]) for i in range(len(lab))],positions=[2.2*i+0.4 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C2"), showfliers=False)
+	bp3 = ax.bxp([results.get_box_stats(val[i][2]) for i in range(len(lab))],positions=[2.2*i+0.8 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C3"), showfliers=False)
+	bp4 = ax.bxp([results.get_box_stats(val[i][3]) for i in range(len(lab))],positions=[2.2*i+1.2 for i in range(len(lab))], widths=0.3, boxprops=dict(color="C4"), showfliers=False)
 	for median in bp1['medians']:
 		median.set_color("C1")
 	for median in bp2['medians']:
@@ -581,7 +1561,7 @@ def testinfo_errors_sr_CP(rule, N, nb_runs) :
 	plt.xlabel("Percentage of total coalitions present in the preorder")
 	plt.xticks([2.2*i+0.6 for i in range(len(lab))], labels=[int(i*100) for i in lab])
 	plt.suptitle("Nb of errors between recovered order and ground truth")
-	plt.title( "(N = "+str(N)+", "+str(nb_runs)+" runs, rule = "+get_rule_name(rule)+")")
+	plt.title( "(N = "+str(N)+", "+get_runs_label(nb_runs, runs, False)+", rule = "+get_rule_name(rule)+")")
 	# plt.legend()
 	if not os.path.exists('out') :
 		os.mkdir('out')
@@ -589,26 +1569,76 @@ def testinfo_errors_sr_CP(rule, N, nb_runs) :
 		os.mkdir('out/plots')
 	if not os.path.exists('out/plots/comb/') :
 		os.mkdir('out/plots/comb')
+	plt.savefig("out/plots/comb/N"+str(N)+"_"+get_rule_name(rule)+"_comb_errors.png", dpi=200)
+	plt.close(fig)
+
+
+# given the rule, the population size N, the number of runs, the tested percentages lab, the histograms val of the results of testinfo_errors_sr_CP, their stream and their keys in it
+# saves the numbers of errors of the combinations of SR methods (with npy, also as .npy files, see results.save_columns) and, unless plots is False, plots them
+def save_errors_sr_CP(rule, N, nb_runs, lab, val, stream, keys, npy=False, plots=True) :
+	if not os.path.exists('out') :
+		os.mkdir('out')
 	if not os.path.exists('out/data') :
 		os.mkdir('outy/data')
 	if not os.path.exists('out/data/comb') :
 		os.mkdir('out/data/comb')
-		
-	plt.savefig("out/plots/comb/N"+str(N)+"_"+get_rule_name(rule)+"_comb_errors.png", dpi=200)
-	plt.close(fig)
-
 	with open('out/data/comb/N'+str(N)+'_'+get_rule_name(rule)+'_comb_errors.csv', 'w') as f:
 		pen = csv.writer(f, delimiter=';')
 		pen.writerow(['Percentage of total coalitions', 'Nb of errors [Lexcel, CP-maj, Banzhaf]'])
-		pen.writerows([[lab[i],val[i]] for i in range(len(lab))])
+		for i in range(len(lab)) :
+			results.write_columns(f, lab[i], stream, keys[i], sum(val[i][0].values()))
+
+	if npy :
+		results.save_columns('out/data/comb/npy', get_file_name("errors_sr_CP", rule, N), ["Lexcel", "CP-maj", "CP+lex", "CP+Banzhaf"], lab, stream, keys, val, nb_runs)
+
+	if plots :
+		plot_errors_sr_CP(rule, N, nb_runs, lab, val, [sum(v[0].values()) for v in val])
+
+
+# plot function of each measure saved by testinfo_all
+plotters = {
+	"exact": plot_exact,
+	"win": plot_win,
+	"KT": plot_KT,
+	"errors": plot_errors,
+	"KT_sr_CP": plot_KT_sr_CP,
+	"errors_sr_CP": plot_errors_sr_CP,
+}
+
+
+# given the number of runs asked for the tests (the number of runs of each percentage being read from the results when they were stopped early)
+# draws the plots of every result saved in out/data, e.g. after tests ran without plots
+def render(nb_runs) :
+	for measure in plotters :
+		folder = 'out/data/'+outputs[measure][0]
+		if not os.path.exists(folder) :
+			continue
+		for rule in range(1, 6) :
+			for N in range(1, 64) :
+				path = folder+'/'+get_file_name(measure, rule, N)+'.csv'
+				if not os.path.exists(path) :
+					continue
+				print("Drawing "+path)
+				if measure in ["exact", "win"] :
+					lab, val, runs = results.read_counts(path)
+					plotters[measure](rule, N, nb_runs, lab, val, runs)
+				else :
+					# the compact copy of the per-run results is memory-mapped rather than parsing the csv file, unless it is older than it (e.g. tests ran again without npy)
+					npy = folder+'/npy/'+get_file_name(measure, rule, N)+'.csv'
+					if os.path.exists(npy) and os.path.getmtime(npy) >= os.path.getmtime(path) :
+						lab, val = results.read_hists_columns(folder+'/npy', get_file_name(measure, rule, N))
+					else :
+						lab, val = results.read_hists(path)
+					plotters[measure](rule, N, nb_runs, lab, val, [sum(v[0].values()) for v in val])
 
 
 # for partial info: tests which method returns exact initial preorder with only a percentage of coalitions of size k available
-def k_info_exact(rule, N, nb_runs) :
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
+def k_info_exact(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, tolerance=None) :
 	print("Testing recovery of exact order from same-sized coalitions with "+get_rule_name(rule))
 	X = [i+1 for i in range(N)]
+	stream = get_stream("k-sized/exact", rule, N, block, seed)
+	# cells (k, percentage, histograms)
+	cells = []
 	stop = N
 	# we know that rules 1 and 2 cannot find the correct order when k > n/2, so no need to go further
 	if rule < 3 :
@@ -627,40 +1657,9 @@ def k_info_exact(rule, N, nb_runs) :
 				continue
 			pc.append(size_g/nbc)
 			size = math.ceil(size_g)
-			lex = 0
-			CP = 0
-			comb = 0
-			for i in range(nb_runs) :
-				order = [(x,) for x in X]
-				random.shuffle(order)
-				res = get_order_from_rule(order, X, rule)
-				
-				res2 = []
-				for eq in res :
-					tmp = [el for el in eq if len(el)==k]
-					if tmp :
-						res2.append(tmp)
-				while len(res2) > size :
-					res2.pop(random.randint(0,len(res2)-1))
-
-				# LEXCEL
-				# returns list of equivalence classes to express ranking over elements
-				o_lex = SR.lexcel(res2, X)
-				if o_lex == [[x[0]] for x in order] :
-					lex += 1
-
-				# CP-MAJORITY
-				# returns list of pairwise preferences (not necessarily transitive)
-				pref_CP = SR.CPmaj(res2, X)
-				o_CP = tools.join_prefs_ind(pref_CP,N)
-				if o_CP == [[x[0]] for x in order] :
-					CP += 1
-
-				# Hybrid CP + lexcel
-				pref_hybrid = tools.corrected_CP(pref_CP, o_lex)
-				o_comb_lex = tools.join_prefs_ind(pref_hybrid,N)
-				if o_comb_lex == [[x[0]] for x in order] :
-					comb += 1
+			hist = run_cell({"k-sized/exact": stream}, trial_k_exact, (rule, N, k, size), nb_runs, pool, seed, tolerance)["k-sized/exact"]
+			cells.append([k, size_g/nbc, hist])
+			lex, CP, comb = get_counts(hist, nb_runs)
 			tab_l.append(lex)
 			tab_cp.append(CP)
 			tab_comb.append(comb)
@@ -687,14 +1686,17 @@ def k_info_exact(rule, N, nb_runs) :
 		pen.writerow(['Number of correct retrieved order (Lexcel)']+storage[1])
 		pen.writerow(['Number of correct retrieved order (CP-maj)']+storage[2])
 		pen.writerow(['Number of correct retrieved order (CP+lex)']+storage[3])
+	if tolerance is not None :
+		save_precision("k-sized/exact", rule, N, ['k', 'Percentage of available coalitions'], cells)
 
 
 # for partial info: tests which method returns exact winner (i.e. not equivalent to another incorrect winner) with only a percentage of coalitions of size k available
-def k_info_win(rule, N, nb_runs) :
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
+def k_info_win(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, tolerance=None) :
 	print("Testing recovery of correct top item from same-sized coalitions with "+get_rule_name(rule))
 	X = [i+1 for i in range(N)]
+	stream = get_stream("k-sized/win", rule, N, block, seed)
+	# cells (k, percentage, histograms)
+	cells = []
 	storage = [[],[],[],[]]
 	for k in range(2,N) :
 		tab_l = []
@@ -709,42 +1711,9 @@ def k_info_win(rule, N, nb_runs) :
 				continue
 			pc.append(size_g/nbc)
 			size = math.ceil(size_g)
-			lex = 0
-			CP = 0
-			comb = 0
-			for i in range(nb_runs) :
-				order = [(x,) for x in X]
-				random.shuffle(order)
-				res = get_order_from_rule(order, X, rule)
-				
-				res2 = []
-				for eq in res :
-					tmp = [el for el in eq if len(el)==k]
-					if tmp :
-						res2.append(tmp)
-				while len(res2) > size :
-					res2.pop(random.randint(0,len(res2)-1))
-
-				# LEXCEL
-				# returns list of equivalence classes to express ranking over elements
-				o_lex = SR.lexcel(res2, X)
-				# we consider that the result is correct only if it returns the correct winner as the UNIQUE correct winner
-				if len(o_lex[0])==1 and o_lex[0][0] == order[0][0] :
-					lex += 1
-
-				# CP-MAJORITY
-				# returns list of pairwise preferences (not necessarily transitive)
-				pref_CP = SR.CPmaj(res2, X)
-				o_CP = tools.join_prefs_ind(pref_CP,N)
-				# we consider that the result is correct only if it returns the correct winner as the UNIQUE correct winner
-				if len(o_CP[0]) == 1 and o_CP[0][0] == order[0][0] :
-					CP += 1
-
-				# Hybrid CP + lexcel
-				pref_hybrid = tools.corrected_CP(pref_CP, o_lex)
-				o_comb_lex = tools.join_prefs_ind(pref_hybrid,N)
-				if len(o_comb_lex[0]) == 1 and o_comb_lex[0][0] == order[0][0] :
-					comb += 1
+			hist = run_cell({"k-sized/win": stream}, trial_k_win, (rule, N, k, size), nb_runs, pool, seed, tolerance)["k-sized/win"]
+			cells.append([k, size_g/nbc, hist])
+			lex, CP, comb = get_counts(hist, nb_runs)
 			tab_l.append(lex)
 			tab_cp.append(CP)
 			tab_comb.append(comb)
@@ -771,14 +1740,17 @@ def k_info_win(rule, N, nb_runs) :
 		pen.writerow(['Number of correct retrieved order (Lexcel)']+storage[1])
 		pen.writerow(['Number of correct retrieved order (CP-maj)']+storage[2])
 		pen.writerow(['Number of correct retrieved order (CP+lex)']+storage[3])
+	if tolerance is not None :
+		save_precision("k-sized/win", rule, N, ['k', 'Percentage of available coalitions'], cells)
 
 
 # for partial info: measures Kendall-Tau distance between initial preorder & that retrieved by each method with only a percentage of coalitions of size k available
-def k_info_KT(rule, N, nb_runs) :
-	tests = [0.05] + [i/10 for i in range(1,10)]
-	tests.append(0.99)
+def k_info_KT(rule, N, nb_runs, pool=None, seed=None, block=1000, tests=default_tests, tolerance=None) :
 	print("Measuring (weak) Kendall-Tau distance between order recovered and ground truth over same-sized coalitions with "+get_rule_name(rule))
 	X = [i+1 for i in range(N)]
+	stream = get_stream("k-sized/KT", rule, N, block, seed)
+	# cells (k, percentage, histograms)
+	cells = []
 	storage = [[],[],[],[]]
 	for k in range(2,N) :
 		tab_l = []
@@ -793,40 +1765,14 @@ def k_info_KT(rule, N, nb_runs) :
 				continue
 			pc.append(size_g/nbc)
 			size = math.ceil(size_g)
-			a1 = []
-			a2 = []
-			a3 = []
-			for i in range(nb_runs) :
-				order = [(x,) for x in X]
-				random.shuffle(order)
-				res = get_order_from_rule(order, X, rule)
-				
-				res2 = []
-				for eq in res :
-					tmp = [el for el in eq if len(el)==k]
-					if tmp :
-						res2.append(tmp)
-				while len(res2) > size :
-					res2.pop(random.randint(0,len(res2)-1))
-
-				# LEXCEL
-				# returns list of equivalence classes to express ranking over elements
-				o_lex = SR.lexcel(res2, X)
-				a1.append(tools.Kendall_Tau(o_lex, [[x[0]] for x in order], X))
-
-				# CP-MAJORITY
-				# returns list of pairwise preferences (not necessarily transitive)
-				pref_CP = SR.CPmaj(res2, X)
-				o_CP = tools.join_prefs_ind(pref_CP,N)
-				a2.append(tools.KT_CP(pref_CP, [[x[0]] for x in order]))
-				
-				# Hybrid CP + lexcel
-				o_comb_lex = tools.corrected_CP(pref_CP, o_lex)
-				a3.append(tools.KT_CP(o_comb_lex, [[x[0]] for x in order]))
-
-			tab_l.append([min(a1),statistics.median(a1),statistics.mean(a1),max(a1)])
-			tab_cp.append([min(a2),statistics.median(a2),statistics.mean(a2),max(a2)])
-			tab_comb.append([min(a3),statistics.median(a3),statistics.mean(a3),max(a3)])
+			hist = run_cell({"k-sized/KT": stream}, trial_k_KT, (rule, N, k, size), nb_runs, pool, seed, tolerance)["k-sized/KT"]
+			cells.append([k, size_g/nbc, hist])
+			a1, a2, a3 = hist
+
+			# statistics computed from the histograms of the results (same values as statistics.median and statistics.mean)
+			tab_l.append([min(a1),results.get_percentile(a1, 50),results.get_mean(a1),max(a1)])
+			tab_cp.append([min(a2),results.get_percentile(a2, 50),results.get_mean(a2),max(a2)])
+			tab_comb.append([min(a3),results.get_percentile(a3, 50),results.get_mean(a3),max(a3)])
 
 		# we also keep track of which percentage of information we've actually tested (no redundancy in the final size of population)
 		storage[0].append(pc)
@@ -850,6 +1796,8 @@ def k_info_KT(rule, N, nb_runs) :
 		pen.writerow(['Results (Lexcel) [min,median, avg,max]']+storage[1])
 		pen.writerow(['Results (CP-maj) [min,median, avg,max]']+storage[2])
 		pen.writerow(['Results (CP+lex) [min,median, avg,max]']+storage[3])
+	if tolerance is not None :
+		save_precision("k-sized/KT", rule, N, ['k', 'Percentage of available coalitions'], cells)
 
 
 def start():
@@ -904,24 +1852,243 @@ def start():
 	if l.lower=="y" :
 		k = True
 
-		
-	for a in range(min_N,max_N+1):
-		if not unique :
-			rule = 1
-		print("----\nN is "+str(a))
-		while rule < 6 :	
-			if k :
-				k_info_exact(rule, a, nb_runs)
-				k_info_win(rule, a, nb_runs)
-				k_info_KT(rule, a, nb_runs)
-			else :
-				testinfo_exact(rule, a, nb_runs)
-				testinfo_win(rule, a, nb_runs)
-				testinfo_KT(rule, a, nb_runs)
-				testinfo_errors(rule, a, nb_runs)
-				testinfo_KT_sr_CP(rule, a, nb_runs)
-				testinfo_errors_sr_CP(rule, a, nb_runs)
-			if unique :
-				break
-			else :
-				rule += 1
\ No newline at end of file
+	npy = False
+	plots = True
+	if not k :
+		try :
+			l = input("By default, per-run results are saved in csv files only. Do you wish to also save them as NumPy arrays (.npy)? (Y/N) ")
+		except ValueError as ve:
+			print("Default settings used")
+		if l.lower()=="y" :
+			npy = True
+		try :
+			l = input("By default, results are plotted as tests end. Do you wish to only save data (plots can be drawn afterwards with render.py)? (Y/N) ")
+		except ValueError as ve:
+			print("Default settings used")
+		if l.lower()=="y" :
+			plots = False
+
+	workers = 1
+	seed = None
+	try :
+		l = input("By default, tests are ran in a single process. Do you wish to run them on several processes? (Y/N) ")
+	except ValueError as ve:
+		print("Default settings used")
+	if l.lower()=="y" :
+		try :
+			workers = int(input("Enter number of worker processes (available cores: "+str(os.cpu_count())+"): "))
+		except ValueError as ve:
+			print("Error in value, set by default to "+str(os.cpu_count()))
+			workers = os.cpu_count()
+		try :
+			seed = int(input("Enter master seed (results for a given seed do not depend on the number of workers): "))
+		except ValueError as ve:
+			seed = random.getrandbits(32)
+			print("Error in value, master seed set to "+str(seed))
+
+	if not unique :
+		rules = [1, 2, 3, 4, 5]
+	else :
+		rules = [rule]
+	run_tests(rules, range(min_N,max_N+1), nb_runs, k, npy, plots, workers, seed)
+
+
+# given the rule, the population size N, the number of runs, whether to run the k-sized tests, and the settings of run_tests
+# runs the tests of the configuration (rule, N)
+def run_config(rule, N, nb_runs, k, npy, plots, pool, seed, block, tests, exact, tolerance, nested) :
+	if k :
+		k_info_exact(rule, N, nb_runs, pool, seed, block, tests, tolerance)
+		k_info_win(rule, N, nb_runs, pool, seed, block, tests, tolerance)
+		k_info_KT(rule, N, nb_runs, pool, seed, block, tests, tolerance)
+	else :
+		# all measures are computed from the same runs
+		testinfo_all(rule, N, nb_runs, pool, seed, block, tests, npy, plots, exact, tolerance, nested)
+
+
+# given the rules, the population sizes Ns, the number of runs, whether to run the k-sized tests, to save .npy files and plots, the number of worker processes, the master seed, the size of the blocks of runs, the tested percentages and, optionally, a shard (shard number, number of shards)
+# runs the tests (or only the given shard of them, see run_shard)
+# with timings, the calls, wall time and CPU time of each stage (see get_stages) are saved for each rule and N in out/data/timings.csv (worker processes included)
+# with profile, each configuration (rule, N) is ran under cProfile, its profile being saved in out/data/profile (worker processes not included)
+def run_tests(rules, Ns, nb_runs, k=False, npy=False, plots=True, workers=1, seed=None, block=1000, tests=default_tests, shard=None, exact=False, tolerance=None, nested=False, timings=False, profile=False) :
+	if timings :
+		enable_timings()
+	pool = None
+	if workers > 1 :
+		pool = multiprocessing.Pool(workers, enable_timings if timings else None)
+
+	if shard is not None :
+		run_shard(rules, Ns, nb_runs, shard[0], shard[1], pool, seed, block, tests, tolerance, nested)
+	else :
+		for a in Ns :
+			print("----\nN is "+str(a))
+			for rule in rules :
+				timing.set_config(rule, a)
+				args = (rule, a, nb_runs, k, npy, plots, pool, seed, block, tests, exact, tolerance, nested)
+				if profile :
+					timing.run_profiled('out/data/profile/N'+str(a)+'_'+get_rule_name(rule)+('_k' if k else '')+'.prof', run_config, *args)
+				else :
+					run_config(*args)
+
+	if pool is not None :
+		pool.close()
+		pool.join()
+	if timings :
+		timing.save('out/data/timings.csv', list(get_stages()), get_rule_name)
+		timing.disable()
+
+
+# settings of start_cli, with their default values
+default_settings = {
+	"rules": [1, 2, 3, 4, 5],
+	"min_N": 4,
+	"max_N": 9,
+	"runs": 10000,
+	"sizes": default_tests,
+	"k": False,
+	"dir": ".",
+	"seed": None,
+	"workers": 1,
+	"block": 1000,
+	"npy": False,
+	"plots": True,
+	"shard": None,
+	"merge": [],
+	"exact": False,
+	"tolerance": None,
+	"nested": False,
+	"timings": False,
+	"profile": False,
+}
+
+
+# type of the value of each setting in a config file: (list, type of the elements) for lists, float settings also accepting integers
+# settings whose default value is None may also be null
+setting_types = {
+	"rules": (list, int),
+	"min_N": int,
+	"max_N": int,
+	"runs": int,
+	"sizes": (list, float),
+	"k": bool,
+	"dir": str,
+	"seed": int,
+	"workers": int,
+	"block": int,
+	"npy": bool,
+	"plots": bool,
+	"shard": str,
+	"merge": (list, str),
+	"exact": bool,
+	"tolerance": float,
+	"nested": bool,
+	"timings": bool,
+	"profile": bool,
+}
+# name of each type in error messages
+type_names = {int: "integer", float: "number", bool: "boolean", str: "string"}
+
+
+# given a value loaded from a json file and a type of setting_types
+# returns True if the value is of this type (booleans not being taken for numbers)
+def has_type(value, kind) :
+	if isinstance(kind, tuple) :
+		return isinstance(value, list) and all([has_type(x, kind[1]) for x in value])
+	if kind in [int, float] and isinstance(value, bool) :
+		return False
+	if kind is float :
+		return isinstance(value, (int, float))
+	return isinstance(value, kind)
+
+
+# given a type of setting_types
+# returns its name in error messages
+def get_type_name(kind) :
+	if isinstance(kind, tuple) :
+		return "list of "+type_names[kind[1]]+"s"
+	return type_names[kind]
+
+
+# given the command-line arguments
+# returns the settings of start_cli: those given on the command line, then those of the config file (json object with the keys of default_settings), then the default ones
+def get_settings(argv) :
+	parser = argparse.ArgumentParser(description="Runs the tests without prompts.")
+	parser.add_argument("--config", help="json file of settings, e.g. {\"rules\": [1, 3], \"max_N\": 6, \"shard\": \"0/4\"}")
+	parser.add_argument("--rules", type=int, nargs="+", help="rules to test: 1 = minmax, 2 = maxmin, 3 = leximin, 4 = leximax, 5 = Borda-sum (default: all)")
+	parser.add_argument("--min-N", dest="min_N", type=int, help="minimum size of population (default: 4)")
+	parser.add_argument("--max-N", dest="max_N", type=int, help="maximal size of population (default: 9)")
+	parser.add_argument("--runs", type=int, help="number of tests ran for each tested size (default: 10000)")
+	parser.add_argument("--sizes", type=float, nargs="+", help="percentages of total coalitions to test, between 0 and 1 (default: 0.05, 0.1, ..., 0.9, 0.99)")
+	parser.add_argument("--k", action="store_const", const=True, help="run tests on k-sized coalitions only instead")
+	parser.add_argument("--dir", help="folder in which results are saved, in a subfolder out (default: current folder)")
+	parser.add_argument("--seed", type=int, help="master seed (results for a given seed do not depend on the number of workers nor of shards)")
+	parser.add_argument("--workers", type=int, help="number of worker processes (default: 1)")
+	parser.add_argument("--block", type=int, help="number of runs per block streamed to disk (default: 1000)")
+	parser.add_argument("--npy", action="store_const", const=True, help="also save per-run results as NumPy arrays")
+	parser.add_argument("--no-plots", dest="plots", action="store_const", const=False, help="only save data (plots can be drawn afterwards with render.py)")
+	parser.add_argument("--shard", help="i/n: only run the i-th (from 0) of n shards of the tests, saving no output")
+	parser.add_argument("--merge", nargs="+", help="folders of shards whose results are merged before running the tests")
+	parser.add_argument("--tolerance", type=float, help="stop each tested size once the 95%% confidence interval of the rate of every measure and method (recovery rate, or distance divided by the number of pairs) is within tolerance on each side, e.g. 0.01 (runs are checked after each block, up to the given number of runs)")
+	parser.add_argument("--exact", action="store_const", const=True, help="compute the recovery of the exact order over all partial preorders of each size instead of sampling them, where there are not too many of them (every size for N = 4, the smallest and largest ones for N = 5, none beyond)")
+	parser.add_argument("--nested", action="store_const", const=True, help="draw in each run nested partial preorders of all tested sizes, coalitions being added one after the other, instead of independent ones for each size")
+	parser.add_argument("--timings", action="store_const", const=True, help="save the number of calls and the wall and CPU time of each stage (lifting, truncation, SR methods, metrics, rendering, ...) for each rule and N in out/data/timings.csv")
+	parser.add_argument("--profile", action="store_const", const=True, help="run each rule and N under cProfile, saving its profile in out/data/profile (main process only)")
+	args = vars(parser.parse_args(argv))
+	settings = dict(default_settings)
+	if args["config"] is not None :
+		with open(args["config"]) as f :
+			config = json.load(f)
+		unknown = [key for key in config if key not in settings]
+		if unknown :
+			parser.error("unknown settings in "+args["config"]+": "+", ".join(unknown))
+		wrong = [key for key in config if not has_type(config[key], setting_types[key]) and not (config[key] is None and default_settings[key] is None)]
+		if wrong :
+			parser.error("settings of the wrong type in "+args["config"]+": "+", ".join([key+" ("+get_type_name(setting_types[key])+" expected)" for key in wrong]))
+		settings.update(config)
+	settings.update({key: v for key, v in args.items() if key != "config" and v is not None})
+	if settings["shard"] is not None :
+		try :
+			settings["shard"] = tuple([int(x) for x in settings["shard"].split("/")])
+		except ValueError :
+			parser.error("shard must be given as i/n")
+		if len(settings["shard"]) != 2 or not 0 <= settings["shard"][0] < settings["shard"][1] :
+			parser.error("shard must be given as i/n, with 0 <= i < n")
+		if settings["k"] :
+			parser.error("tests on k-sized coalitions cannot be sharded")
+	if settings["nested"] and settings["k"] :
+		parser.error("tests on k-sized coalitions cannot be nested")
+	if settings["min_N"] < 2 :
+		parser.error("min_N must be at least 2")
+	if settings["max_N"] < settings["min_N"] :
+		parser.error("max_N must be larger than min_N")
+	for key in ["runs", "block", "workers"] :
+		if settings[key] < 1 :
+			parser.error(key+" must be at least 1")
+	if [r for r in settings["rules"] if not 1 <= r <= 5] :
+		parser.error("rules must be between 1 and 5")
+	if [x for x in settings["sizes"] if not 0 < x < 1] :
+		parser.error("sizes must be between 0 and 1")
+	settings["sizes"] = sorted(set(settings["sizes"]))
+	if settings["tolerance"] is not None and not 0 < settings["tolerance"] < 1 :
+		parser.error("tolerance must be between 0 and 1")
+	return settings
+
+
+# given the command-line arguments (see get_settings)
+# runs the tests without prompts, e.g. under a scheduler
+def start_cli(argv) :
+	settings = get_settings(argv)
+	folders = [os.path.abspath(folder) for folder in settings["merge"]]
+	if not os.path.exists(settings["dir"]) :
+		os.makedirs(settings["dir"])
+	os.chdir(settings["dir"])
+	merge(folders)
+	run_tests(settings["rules"], range(settings["min_N"], settings["max_N"]+1), settings["runs"], settings["k"], settings["npy"], settings["plots"], settings["workers"], settings["seed"], settings["block"], settings["sizes"], settings["shard"], settings["exact"], settings["tolerance"], settings["nested"], settings["timings"], settings["profile"])
+
+
+def start_render():
+	try :
+		nb_runs = int(input("Enter number of tests that were ran for each population size: "))
+	except ValueError as ve:
+		print("Error in value, set by defaut to 10 000")
+		nb_runs = 10000
+	render(nb_runs)
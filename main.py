@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import sys
+
 import launch
 
 if __name__ == "__main__" :
-	launch.start()
\ No newline at end of file
+	# with arguments (see python3 main.py --help), tests are ran without prompts
+	if len(sys.argv) > 1 :
+		launch.start_cli(sys.argv[1:])
+	else :
+		launch.start()
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+import launch
+
+if __name__ == "__main__" :
+	launch.start_render()
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import math
+import collections
+import fractions
+
+import numpy as np
+
+
+# version of the runs streamed: streams written by another version hold other runs (e.g. partial preorders of small sizes drawn differently), which are neither resumed nor merged
+version = 2
+
+
+# per-run results of one measure for a given rule and population size, streamed to a csv file block of runs after block of runs
+# each row of the csv file holds one block: the key of the tested configuration (e.g. rule;N;size), the block number, then for each method the space-separated results of the runs
+# the manifest lists the rows completely written (with their position in the csv file): these blocks are not ran again when restarting
+class Stream :
+	def __init__(self, path, block, seed) :
+		self.path = path+".csv"
+		self.manifest = path+".manifest"
+		self.block = block
+		# (key, block number, number of runs) -> position of the row in the csv file
+		self.done = {}
+		self.header = "block="+str(block)+";seed="+str(seed)+";version="+str(version)
+		if not os.path.exists(os.path.dirname(path)) :
+			os.makedirs(os.path.dirname(path))
+		if os.path.exists(self.manifest) :
+			with open(self.manifest) as f :
+				lines = f.read().splitlines()
+			if lines and lines[0] == self.header :
+				for l in lines[1:] :
+					# a line cut by a crash is ignored
+					try :
+						t = tuple([int(x) for x in l.split(";")])
+					except ValueError :
+						continue
+					self.done[t[:-1]] = t[-1]
+				return
+			# results obtained with other settings are kept aside rather than mixed with the new ones
+			print("Results in "+self.path+" were obtained with other settings, moved to "+self.path+".old")
+			os.replace(self.manifest, self.manifest+".old")
+			if os.path.exists(self.path) :
+				os.replace(self.path, self.path+".old")
+		with open(self.manifest, "w") as f :
+			f.write(self.header+"\n")
+
+	# given the key of a configuration, a block number b and the number n of runs in the block
+	# returns True if the block was completely written
+	def is_done(self, key, b, n) :
+		return tuple(key)+(b, n) in self.done
+
+	# given the key of a configuration, a block number b and the list of the results of its runs (one list of results per run, one result per method)
+	# appends the block to the csv file and records it in the manifest
+	def write(self, key, b, rows) :
+		line = [str(x) for x in key]+[str(b)]+[" ".join([str(r[j]) for r in rows]) for j in range(len(rows[0]))]
+		self.append(tuple(key)+(b, len(rows)), (";".join(line)+"\n").encode())
+
+	# given the entry (key, block number, number of runs) of a block and its row (bytes)
+	# appends the row to the csv file and records it in the manifest
+	def append(self, entry, row) :
+		with open(self.path, "ab") as f :
+			pos = f.tell()
+			f.write(row)
+			f.flush()
+			os.fsync(f.fileno())
+		with open(self.manifest, "a") as f :
+			f.write(";".join([str(x) for x in entry+(pos,)])+"\n")
+			f.flush()
+			os.fsync(f.fileno())
+		self.done[entry] = pos
+
+	# given the key of a configuration, a block number b and the number n of runs in the block
+	# returns the results of the runs of the block, as given to write
+	def load(self, key, b, n) :
+		with open(self.path, "rb") as f :
+			f.seek(self.done[tuple(key)+(b, n)])
+			line = f.readline().decode().rstrip("\n").split(";")
+		cols = [[int(x) for x in c.split(" ")] for c in line[len(key)+1:]]
+		return [[c[i] for c in cols] for i in range(n)]
+
+	# given the key of a configuration and the total number of runs
+	# yields, block after block, the results of each method over the runs of the block (one list per method)
+	def columns(self, key, nb_runs) :
+		for b in range(get_nb_blocks(nb_runs, self.block)) :
+			rows = self.load(key, b, get_block_len(b, nb_runs, self.block))
+			yield [[r[j] for r in rows] for j in range(len(rows[0]))]
+
+
+# given the paths (without extension) of a stream src and of a stream dst, e.g. of a shard and of the merged results
+# appends to dst the blocks of src it does not have, dst being created with the settings of src if needed
+def merge_stream(src, dst) :
+	with open(src+".manifest") as f :
+		lines = f.read().splitlines()
+	settings = dict([x.split("=") for x in lines[0].split(";")])
+	if settings.get("version") != str(version) :
+		print("Results in "+src+".csv were obtained with another version, not merged")
+		return
+	seed = None if settings["seed"] == "None" else int(settings["seed"])
+	stream = Stream(dst, int(settings["block"]), seed)
+	# no block was written in src
+	if not lines[1:] :
+		return
+	with open(src+".csv", "rb") as f :
+		for l in lines[1:] :
+			try :
+				t = tuple([int(x) for x in l.split(";")])
+			except ValueError :
+				continue
+			if t[:-1] not in stream.done :
+				f.seek(t[-1])
+				stream.append(t[:-1], f.readline())
+
+
+# given a number of runs and the size of the blocks
+# returns the number of blocks needed
+def get_nb_blocks(nb_runs, block) :
+	return (nb_runs+block-1)//block
+
+
+# given a block number b, the total number of runs and the size of the blocks
+# returns the number of runs in block b
+def get_block_len(b, nb_runs, block) :
+	return min(block, nb_runs-b*block)
+
+
+# given a histogram (Counter: value -> number of runs) and a percentage q
+# returns the q-th percentile of the values, interpolated as numpy.percentile does
+def get_percentile(hist, q) :
+	values = sorted(hist)
+	n = sum(hist.values())
+	pos = (n-1)*q/100
+	low = int(pos)
+	# values at sorted positions low and low+1
+	v = []
+	seen = 0
+	for x in values :
+		seen += hist[x]
+		while len(v) < 2 and seen > low+len(v) :
+			v.append(x)
+	if pos == low :
+		return v[0]
+	return v[0]+(v[1]-v[0])*(pos-low)
+
+
+# given a histogram (Counter: value -> number of runs)
+# returns the mean of the values, as statistics.mean does (int when exact)
+def get_mean(hist) :
+	m = fractions.Fraction(sum([x*c for x, c in hist.items()]), sum(hist.values()))
+	if m.denominator == 1 :
+		return int(m)
+	return float(m)
+
+
+# given a histogram (Counter: value -> number of runs) of values between 0 and scale and the z-score of the confidence level (1.96 for 95%)
+# returns the half-width of the Wilson score interval of the rate of the values (mean divided by scale)
+# values between 0 and 1 have at most the variance of 0/1 values of the same mean: the interval is conservative, and does not vanish when all values are 0 (or all 1)
+def get_half_width(hist, scale, z=1.96) :
+	n = sum(hist.values())
+	p = sum([x*c for x, c in hist.items()])/(n*scale)
+	return z/(1+z*z/n)*math.sqrt(p*(1-p)/n+z*z/(4*n*n))
+
+
+# given a histogram (Counter: value -> number of runs)
+# returns the statistics drawn by matplotlib's boxplot (whiskers at 1.5 IQR, no fliers), to be given to Axes.bxp
+def get_box_stats(hist) :
+	hist = collections.Counter({x: c for x, c in hist.items() if c > 0})
+	if not hist :
+		return {"med": float("nan"), "q1": float("nan"), "q3": float("nan"), "whislo": float("nan"), "whishi": float("nan"), "fliers": []}
+	q1 = get_percentile(hist, 25)
+	q3 = get_percentile(hist, 75)
+	iqr = q3-q1
+	inside = [x for x in hist if q1-1.5*iqr <= x <= q3+1.5*iqr]
+	return {
+		"med": get_percentile(hist, 50),
+		"q1": q1,
+		"q3": q3,
+		# whiskers never go inside the box
+		"whislo": min(inside+[q1]),
+		"whishi": max(inside+[q3]),
+		"fliers": [],
+	}
+
+
+# given an open csv file f, a label, a stream, the key of a configuration and its number of runs (as many as in its histograms, fewer than the number asked if it was stopped early)
+# writes the row "label;[[runs of method 1], [runs of method 2], ...]" as csv.writer does for lists of per-run results, reading the per-run results back from the stream one block at a time
+def write_columns(f, label, stream, key, nb_runs) :
+	width = len(stream.load(key, 0, get_block_len(0, nb_runs, stream.block))[0])
+	f.write(str(label)+";[")
+	for j in range(width) :
+		f.write("[" if j == 0 else ", [")
+		sep = ""
+		for cols in stream.columns(key, nb_runs) :
+			f.write(sep+", ".join([str(x) for x in cols[j]]))
+			sep = ", "
+		f.write("]")
+	f.write("]\r\n")
+
+
+# given the path of a csv file written by write_columns (after a header row)
+# returns the percentages of its rows and, for each of them, the histogram (Counter: value -> number of runs) of the results of each method
+def read_hists(path) :
+	lab = []
+	hists = []
+	with open(path) as f :
+		f.readline()
+		for line in f :
+			label, cols = line.rstrip("\r\n").split(";", 1)
+			lab.append(float(label))
+			hists.append([collections.Counter([int(x) for x in c.split(", ")]) for c in cols[2:-2].split("], [")])
+	return lab, hists
+
+
+# given a number written in a csv file
+# returns it as an int, or as a float if it is not an integer (e.g. an expected count)
+def get_number(x) :
+	try :
+		return int(x)
+	except ValueError :
+		return float(x)
+
+
+# given the path of a csv file of counts (one list of counts per percentage, then possibly its number of runs, after a header row)
+# returns the percentages, the counts (int, or float for expected counts) and the numbers of runs (None if the file does not give them)
+def read_counts(path) :
+	with open(path) as f :
+		rows = list(csv.reader(f, delimiter=";"))[1:]
+	runs = None
+	if rows and len(rows[0]) > 2 :
+		runs = [int(r[2]) for r in rows]
+	return [float(r[0]) for r in rows], [[get_number(x) for x in r[1][1:-1].split(", ")] for r in rows], runs
+
+
+# given a folder, a file name, the names of the methods, the tested percentages lab, the stream of the results, the keys of the tested sizes in it, their histograms and the number of runs
+# saves the per-run results of each tested percentage (as many as in its histograms, fewer than nb_runs if it was stopped early) as an array (methods x runs) of the smallest unsigned int type holding them, in a .npy file that can be memory-mapped (see load_columns)
+# the files are listed, with the method names, in the index <name>.csv of the folder
+def save_columns(folder, name, methods, lab, stream, keys, hists, nb_runs) :
+	if not os.path.exists(folder) :
+		os.makedirs(folder)
+	dtype = np.min_scalar_type(max([0]+[max(h) for hs in hists for h in hs if h]))
+	with open(os.path.join(folder, name+".csv"), "w") as f :
+		pen = csv.writer(f, delimiter=";")
+		pen.writerow(["Methods"]+methods)
+		for i in range(len(lab)) :
+			file = name+"_"+str(keys[i][-1])+".npy"
+			runs = sum(hists[i][0].values())
+			arr = np.lib.format.open_memmap(os.path.join(folder, file), mode="w+", dtype=dtype, shape=(len(methods), runs))
+			start = 0
+			for cols in stream.columns(keys[i], runs) :
+				arr[:, start:start+len(cols[0])] = cols
+				start += len(cols[0])
+			arr.flush()
+			del arr
+			pen.writerow([lab[i], file])
+
+
+# given a folder and a file name
+# returns the names of the methods and, for each tested percentage, the percentage and the memory-mapped array (methods x runs) of the per-run results saved by save_columns
+def load_columns(folder, name) :
+	with open(os.path.join(folder, name+".csv")) as f :
+		rows = list(csv.reader(f, delimiter=";"))
+	return rows[0][1:], [(float(r[0]), np.load(os.path.join(folder, r[1]), mmap_mode="r")) for r in rows[1:]]
+
+
+# given a folder and a file name
+# returns, as read_hists does, the percentages and the histograms of the results of each method, counted on the arrays memory-mapped by load_columns instead of parsing the csv file
+def read_hists_columns(folder, name) :
+	lab = []
+	hists = []
+	for pct, arr in load_columns(folder, name)[1] :
+		lab.append(pct)
+		hists.append([collections.Counter(dict(zip(*[x.tolist() for x in np.unique(row, return_counts=True)]))) for row in arr])
+	return lab, hists
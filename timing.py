@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import time
+import functools
+import cProfile
+
+
+# time spent in the stages of the tests, for each configuration: (stage, rule, N) -> [number of calls, wall time, CPU time] (seconds)
+totals = {}
+# configuration (rule, N) to which calls are counted
+config = (None, None)
+# stages being ran: calls made within a stage are part of it and are not counted again
+running = set()
+# functions replaced by timed ones: (module or class, name) -> original function
+originals = {}
+
+
+# returns True if stages are timed (see enable)
+def is_enabled() :
+	return len(originals) > 0
+
+
+# given a rule number and a population size N
+# sets the configuration to which the following calls are counted
+def set_config(rule, N) :
+	global config
+	config = (rule, N)
+
+
+# given the name of a stage and a function
+# returns the function counting the number of its calls and the wall and CPU time they take in totals, as part of the stage
+def timed(stage, f) :
+	@functools.wraps(f)
+	def g(*args, **kwargs) :
+		if stage in running :
+			return f(*args, **kwargs)
+		running.add(stage)
+		wall = time.perf_counter()
+		cpu = time.process_time()
+		try :
+			return f(*args, **kwargs)
+		finally :
+			running.discard(stage)
+			t = totals.setdefault((stage,)+config, [0, 0.0, 0.0])
+			t[0] += 1
+			t[1] += time.perf_counter()-wall
+			t[2] += time.process_time()-cpu
+	return g
+
+
+# given the stages to time (stage -> list of (module or class, name of a function))
+# replaces their functions by timed ones (see timed): functions are left untouched, and cost nothing more, as long as this is not called
+def enable(stages) :
+	for stage, funcs in stages.items() :
+		for owner, name in funcs :
+			if (owner, name) not in originals :
+				originals[(owner, name)] = getattr(owner, name)
+				setattr(owner, name, timed(stage, originals[(owner, name)]))
+
+
+# puts back the original functions of the timed stages and forgets the recorded times
+def disable() :
+	for (owner, name), f in originals.items() :
+		setattr(owner, name, f)
+	originals.clear()
+	totals.clear()
+
+
+# returns the times recorded so far (see totals), recording the next ones from scratch, e.g. to send those of a worker process to the main one
+def collect() :
+	res = dict(totals)
+	totals.clear()
+	return res
+
+
+# given times recorded by collect, e.g. in a worker process
+# adds them to those of this process
+def add(other) :
+	for key, (calls, wall, cpu) in other.items() :
+		t = totals.setdefault(key, [0, 0.0, 0.0])
+		t[0] += calls
+		t[1] += wall
+		t[2] += cpu
+
+
+# given the path of a csv file, the names of the stages in the order of the report and a function giving the name of a rule
+# saves the recorded times, for each configuration (N, then rule) and stage
+def save(path, stages, get_rule_name) :
+	if not os.path.exists(os.path.dirname(path)) :
+		os.makedirs(os.path.dirname(path))
+	keys = sorted(totals, key=lambda k: (k[2] is None, k[2] or 0, k[1] is None, k[1] or 0, stages.index(k[0]) if k[0] in stages else len(stages)))
+	with open(path, "w") as f :
+		pen = csv.writer(f, delimiter=";")
+		pen.writerow(["Stage", "Rule", "N", "Calls", "Wall time (s)", "CPU time (s)"])
+		for k in keys :
+			calls, wall, cpu = totals[k]
+			pen.writerow([k[0], "" if k[1] is None else get_rule_name(k[1]), "" if k[2] is None else k[2], calls, round(wall, 6), round(cpu, 6)])
+
+
+# given the path of a file, a function and its arguments
+# runs the function under cProfile, saving its profile in the file (to be read with pstats), and returns its result
+def run_profiled(path, f, *args) :
+	if not os.path.exists(os.path.dirname(path)) :
+		os.makedirs(os.path.dirname(path))
+	profile = cProfile.Profile()
+	try :
+		return profile.runcall(f, *args)
+	finally :
+		profile.dump_stats(path)
@@ -2,9 +2,12 @@
 
 # from collections import Counter
 
-import copy
 import itertools
 
+import numpy as np
+
+import kendall
+
 # given a population N (list of elements) + an integer b
 # returns the powerset of the population starting with coalitions of size b; with emptyset otherwise
 def generate_powerset(N, b) :
@@ -17,9 +20,123 @@ def generate_powerset(N, b) :
 	return coal
 
 
+# coalitions can also be encoded as bitmasks (int): the i-th element of the population is bit i
+# given a population N (list of elements)
+# returns a dict associating each element of N to its bit
+def get_bits(N) :
+	return {N[i]: 1 << i for i in range(len(N))}
+
+
+# given a coalition C (tuple) and the bits of the population (see get_bits)
+# returns the bitmask encoding C
+def to_mask(C, bits) :
+	m = 0
+	for el in C :
+		m |= bits[el]
+	return m
+
+
+# given a bitmask m and a population N (list of elements)
+# returns the coalition (tuple) encoded by m, its elements ordered as in N
+def from_mask(m, N) :
+	return tuple([N[i] for i in range(len(N)) if m >> i & 1])
+
+
+# given a list of equivalence classes of bitmasks and a population N
+# returns the same preorder with coalitions as tuples
+def from_masks(order, N) :
+	return [[from_mask(m, N) for m in eq] for eq in order]
+
+
+# given a bitmask m
+# returns the number of elements in the coalition encoded by m
+def mask_size(m) :
+	return bin(m).count("1")
+
+
+# given the size n of a population + an integer b
+# returns the bitmasks of the powerset starting with coalitions of size b, in the same order as generate_powerset
+def generate_powerset_masks(n, b) :
+	if b < 0 :
+		print("Error in generate_powerset_masks : var b must be >= 0 but is here "+str(b))
+		return []
+	coal = []
+	for i in range(b,n+1) :
+		for c in itertools.combinations(range(n),i) :
+			m = 0
+			for j in c :
+				m |= 1 << j
+			coal.append(m)
+	return coal
+
+
+# given an array of keys (uint64) and a count
+# returns an array (keys x count) of floats uniform in [0, 1): row i only depends on keys[i], and its j-th value on (keys[i], j) (splitmix64 over a counter)
+def uniforms(keys, count) :
+	z = keys[:,None]+np.arange(1, count+1, dtype=np.uint64)*np.uint64(0x9E3779B97F4A7C15)
+	z = (z ^ (z >> np.uint64(30)))*np.uint64(0xBF58476D1CE4E5B9)
+	z = (z ^ (z >> np.uint64(27)))*np.uint64(0x94D049BB133111EB)
+	z = z ^ (z >> np.uint64(31))
+	return (z >> np.uint64(11))*(2.0**-53)
+
+
+# preorder (list of equivalence classes) which also maps each of its elements to the index of its equivalence class
+# it can be used anywhere a list of equivalence classes is expected, with O(1) lookups in is_before and is_present
+# CAREFUL: the mapping is computed once at creation, the equivalence classes must not be modified afterwards
+class Preorder(list) :
+	def __init__(self, order=()) :
+		super().__init__(order)
+		self.rank = {}
+		for i in range(len(self)) :
+			for el in self[i] :
+				self.rank[el] = i
+		self.by_mask = {}
+		self.arrays = {}
+
+	# given a population N
+	# returns a dict mapping the bitmask of each coalition of the preorder to the index of its equivalence class
+	def mask_rank(self, N) :
+		key = tuple(N)
+		if key not in self.by_mask :
+			bits = get_bits(N)
+			self.by_mask[key] = {to_mask(C, bits): r for C, r in self.rank.items()}
+		return self.by_mask[key]
+
+	# given a population N
+	# returns the rank array of the preorder: int array of size 2^len(N) giving, at the bitmask of each coalition, the index of its equivalence class (-1 if absent)
+	def rank_array(self, N) :
+		key = tuple(N)
+		if key not in self.arrays :
+			rank = np.full(2**len(N), -1, dtype=np.int32)
+			for m, r in self.mask_rank(N).items() :
+				rank[m] = r
+			self.arrays[key] = rank
+		return self.arrays[key]
+
+
+# given a preorder (list of equivalence classes or Preorder)
+# returns it as a Preorder, building the mapping only if it was not already done
+def to_preorder(order) :
+	if isinstance(order, Preorder) :
+		return order
+	return Preorder(order)
+
+
 # given two coalitions (tuples) X and Y and a preorder (list of equivalence classes)
 # returns True if X is before Y in the preorder ; False if after ; -1 if they are equivalent
 def is_before(X,Y,order) :
+	if isinstance(order, Preorder) :
+		r_x = order.rank.get(X)
+		r_y = order.rank.get(Y)
+		if r_x is None :
+			if r_y is None :
+				return None
+			return False
+		if r_y is None or r_x < r_y :
+			return True
+		if r_x == r_y :
+			return -1
+		return False
 	is_x = False
 	is_y = False
 	for eq in order :
@@ -40,91 +157,90 @@ def is_before(X,Y,order) :
 # given an element el and a ranking prefs (list of equivalence classes)
 # returns True if el is in the ranking; False otherwise 
 def is_present(el,prefs) :
+	if isinstance(prefs, Preorder) :
+		return el in prefs.rank
 	for eq in prefs :
 	 	if el in eq :
 	 		return True
 	return False
 
 
-# given a list of pairwise preferences (lists [x,y] signifying that x > y) and the size N of the studied population
+# given a list of pairwise preferences (lists [x,y] signifying that x > y), or their dominance matrix (see SR.CP_matrix), and the size N of the studied population (individuals 1 to N)
 # returns order over individuals based on expressed pairwise preferences
 def join_prefs_ind(prefs,N) :
+	pop = [i+1 for i in range(N)]
+	if not isinstance(prefs, np.ndarray) :
+		prefs = kendall.get_relation(prefs, pop)
 	res = []
 
-	cands = [i+1 for i in range(N)]
+	cands = [i for i in range(N)]
 	while len(cands) > 1 :
-		# retrieve elements dominated by each element
-		tmp = [[y for y in cands if [x,y] in prefs] for x in cands]
+		# dom[x, y] if the x-th candidate dominates the y-th one
+		dom = prefs[np.ix_(cands, cands)]
 		# get nb of dominated elements by each element
-		lens = [len(l) for l in tmp]
-		if max(lens) == min(lens) :
-			res.append(cands)
+		lens = dom.sum(axis=1)
+		if lens.max() == lens.min() :
+			res.append([pop[c] for c in cands])
 			return res
 		# retrieve index of element with highest number of dominated elements
-		i = lens.index(max(lens))
+		i = int(lens.argmax())
 		# this element will be in its own equivalence class
-		eq = [cands[i]]
 		# we add to the equivalence class any other element to which x is equivalent (i.e. prefs contains both [x,y] and [y,x])
-		for el in tmp[i] :
-			if cands[i] in tmp[cands.index(el)] :
-				eq.append(el)
-		res.append(eq)
-		cands = [i for i in cands if i not in eq]
+		eq = [cands[i]]+[cands[j] for j in np.nonzero(dom[i] & dom[:, i])[0].tolist()]
+		res.append([pop[c] for c in eq])
+		cands = [c for c in cands if c not in eq]
 	if len(cands) > 0 :
-		res.append(cands)
+		res.append([pop[c] for c in cands])
 	return res
 
 
-# given a list of pairwise preferences (lists [x,y] signifying that x > y) and a preorder og
+# given a list of pairwise preferences (lists [x,y] signifying that x > y), or their dominance matrix over a population pop (1, ..., n by default, see SR.CP_matrix), and a preorder og
 # returns the KT distance between preorder expressed via prefs and og, counting equivalence as wrong if not in og
-def KT_CP(prefs,og) :
-	p2 = copy.deepcopy(prefs)
-	dist = 0
-	while p2 :
-		# in case of an equivalence
-		if p2[0][::-1] in p2 :
-			tmp = [x for x in og if p2[0][0] in x and p2[0][1] in x]
-			# if this equivalence is not present in the preorder og
-			if not tmp :
-				# then there is a contradiction, and the distance is increased by 1
-				dist += 1
-			p2 = [x for x in p2 if x != p2[0] and x != p2[0][::-1]] 
-		# if there is no equivalence
-		else :
-			corr = is_before(p2[0][0], p2[0][1], og)
-			# if order is reversed in og (or equivalence), we increase the distance
-			if not corr or corr == -1 :
-				dist += 1
-			p2.remove(p2[0])
-	return dist
-
-
-# given a list of pairwise preferences (lists [x,y] signifying that x > y) and a preorder og
+# an equivalence not present in og increases the distance by 1, as does a preference reversed in og (or equivalence)
+def KT_CP(prefs,og,pop=None) :
+	if not isinstance(prefs, np.ndarray) :
+		pop = get_elements(prefs, og)
+		prefs = kendall.get_relation(prefs, pop)
+	elif pop is None :
+		pop = [i+1 for i in range(len(prefs))]
+	return int(kendall.CP_distances(prefs, kendall.get_ranks(og, pop)))
+
+
+# given a list of pairwise preferences (lists [x,y] signifying that x > y), or their dominance matrix over a population pop (1, ..., n by default, see SR.CP_matrix), and a preorder og
 # returns the number of pairs of elements for which the preference in one preorder is opposite to that in the other (meaning equivalences not counted)
-def count_inverse(prefs,og) :
-	p2 = copy.deepcopy(prefs)
-	dist = 0
-	while p2 :
-		# in case of an equivalence, it cannot lead to a contradiction: we simply remove it
-		if p2[0][::-1] in p2 :
-			p2 = [x for x in p2 if x != p2[0] and x != p2[0][::-1]] 
-		# if there is no equivalence
-		else :
-			corr = is_before(p2[0][0], p2[0][1], og)
-			# if order is reversed in og, we increase the distance
-			if not corr :
-				dist += 1
-			p2.remove(p2[0])
-	return dist
-
-
-# given a list of pairwise preferences WITHOUT EQUIVALENCES (lists [A,B] signifying that A > B) and the studied set of coalitions ps
-# returns preorder over coalitions based on expressed pairwise preferences
-def join_prefs_coal(prefs,ps) :
+# an equivalence cannot lead to a contradiction, a preference counts if reversed in og
+def count_inverse(prefs,og,pop=None) :
+	if not isinstance(prefs, np.ndarray) :
+		pop = get_elements(prefs, og)
+		prefs = kendall.get_relation(prefs, pop)
+	elif pop is None :
+		pop = [i+1 for i in range(len(prefs))]
+	return int(kendall.CP_inversions(prefs, kendall.get_ranks(og, pop)))
+
+
+# given a list of pairwise preferences and a preorder
+# returns the elements appearing in either of them
+def get_elements(prefs, order) :
+	pop = []
+	seen = set()
+	for el in [x for p in prefs for x in p]+[x for eq in order for x in eq] :
+		if el not in seen :
+			seen.add(el)
+			pop.append(el)
+	return pop
+
+
+# given a list of elements and their scores (list or array)
+# returns preorder over the elements grouping equal scores, from the highest score to the lowest (elements of a class keep their order in the list)
+def group_by_score(elements, score) :
+	score = np.asarray(score)
+	idx = np.argsort(-score, kind="stable").tolist()
+	score = score.tolist()
 	res = []
-	for i in range(len(ps)) :
-		tmp = [x for x in ps if len([c for c in prefs if c[1]==x])== i]
-		res.append(tmp)
+	for i in range(len(idx)) :
+		if i == 0 or score[idx[i]] != score[idx[i-1]] :
+			res.append([])
+		res[-1].append(elements[idx[i]])
 	return res
 
 
@@ -162,35 +278,26 @@ def lex_comp_max(v_A,v_B) :
 	return 0
 
 
-# given a list of pairwise prefs representing the result of CP and a preorder (list of equivalence classes) representing the result of another social ranking method
-# returns the result of CP "corrected" by the sr method: if a~b according to CP but the sr method expresses a strict preference, then we use that strict preference in CP
-def corrected_CP(cp, sr) :
-	res = copy.deepcopy(cp)
-	ind = [x for x in cp if x[::-1] in cp]
-	while ind :
-		# find positions of ind[0][0] and ind[0][1] in sr
-		for eq in sr :
-			if ind[0][0] in eq :
-				# if ind[0][0] > ind[0][1]
-				if not ind[0][1] in eq :
-					res.remove([ind[0][1],ind[0][0]])
-				# otherwise if they're equivalent, then we do not change the prefs of CP over them
-				break
-			# if ind[0][1] placed before ind[0][0]
-			elif ind[0][1] in eq :
-				res.remove([ind[0][0], ind[0][1]])
-				break
-		ind.remove(ind[0][::-1])
-		ind.remove(ind[0])
-	return res
+# given a list of pairwise prefs, or their dominance matrix over a population pop (1, ..., n by default, see SR.CP_matrix), representing the result of CP and a preorder (list of equivalence classes) representing the result of another social ranking method
+# returns the result of CP "corrected" by the sr method: if a~b according to CP but the sr method expresses a strict preference, then we use that strict preference in CP (in the same form as cp)
+def corrected_CP(cp, sr, pop=None) :
+	if not isinstance(cp, np.ndarray) :
+		els = get_elements(cp, sr)
+		index = {els[i]: i for i in range(len(els))}
+		W = corrected_CP(kendall.get_relation(cp, els), sr, els)
+		return [[x, y] for x, y in cp if W[index[x], index[y]]]
+	if pop is None :
+		pop = [i+1 for i in range(len(cp))]
+	rank = np.array(kendall.get_ranks(sr, pop), dtype=np.int64)
+	present = rank >= 0
+	# before[x, y] if x is found in sr before y (in an earlier equivalence class, or y is absent)
+	before = present[:, None] & (~present[None, :] | (rank[:, None] < rank[None, :]))
+	# for each equivalence of CP over x and y, the preference of y over x is removed if x is before y in sr (kept if they're equivalent in sr or both absent)
+	both = cp & cp.T
+	return cp & ~(both & before.T)
 
 
 # given two rankings (list of equivalence classes) v1 and v2 over a population pop
 # returns the Kendall-Tau distance between v1 and v2 (i.e. number of pairs for which there is a disagreement in preferences)
 def Kendall_Tau(v1,v2,pop) :
-	res = 0
-	for i in range(len(pop)) :
-		for j in range(i+1, len(pop)) :
-			if is_before(pop[i],pop[j],v1) != is_before(pop[i],pop[j],v2) :
-				res += 1
-	return res
\ No newline at end of file
+	return kendall.distance(kendall.get_ranks(v1, pop), kendall.get_ranks(v2, pop))
\ No newline at end of file